@@ -53,7 +53,7 @@ def get_components():
     signal_engine = AISignalEngine()
     paper_engine = PaperTradingEngine()
     journal = TradeJournal()
-    report_gen = ReportGenerator()
+    report_gen = ReportGenerator(journal, paper_engine, signal_engine)
     risk_manager = RiskManager()
     live_engine = LiveTradingEngine()
     return market_data, signal_engine, paper_engine, journal, report_gen, risk_manager, live_engine
@@ -965,7 +965,7 @@ def show_ai_signals():
         st.markdown("**AI Signal Timeline - Entry & Exit Points**")
         
         # Get recent signals for chart
-        recent_signals = signal_engine.signals_history[-50:] if len(signal_engine.signals_history) > 0 else []
+        recent_signals = list(signal_engine.signals_history)[-50:]
         
         if recent_signals:
             signal_df = pd.DataFrame(recent_signals)
@@ -1429,8 +1429,13 @@ def show_reports():
         
         if st.button("Generate Report", type="primary"):
             with st.spinner("Generating report..."):
-                if report_format in ["PDF", "Both"]:
-                    pdf_path = report_gen.generate_pdf_report(report_type, start_date, end_date)
+                pdf_path, excel_path = report_gen.generate_reports(
+                    report_type, start_date, end_date,
+                    pdf=report_format in ["PDF", "Both"],
+                    excel=report_format in ["Excel", "Both"]
+                )
+                
+                if pdf_path:
                     with open(pdf_path, "rb") as file:
                         st.download_button(
                             label="📄 Download PDF Report",
@@ -1439,8 +1444,7 @@ def show_reports():
                             mime="application/pdf"
                         )
                 
-                if report_format in ["Excel", "Both"]:
-                    excel_path = report_gen.generate_excel_report(report_type, start_date, end_date)
+                if excel_path:
                     with open(excel_path, "rb") as file:
                         st.download_button(
                             label="📊 Download Excel Report",
@@ -194,14 +194,11 @@ class AILearningSystem:
             return None, None, []
         
         try:
-            # Convert learning data to DataFrame
-            df = pd.DataFrame(self.learning_data)
-            
             # Extract features
             features_list = []
             targets_list = []
             
-            for _, record in df.iterrows():
+            for record in self.learning_data:
                 # Extract feature vector
                 feature_vector = []
                 for feature_name in self.feature_names:
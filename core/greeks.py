@@ -129,7 +129,11 @@ class GreeksCalculator:
     def get_time_to_expiry(self, expiry_date):
         """Calculate time to expiry in years"""
         if isinstance(expiry_date, str):
-            expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
+            # Fixed-width YYYY-MM-DD skips strptime's format parsing (same gate as utils.helpers)
+            if len(expiry_date) == 10 and expiry_date[4] == '-' and expiry_date[7] == '-':
+                expiry = datetime.fromisoformat(expiry_date)
+            else:
+                expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
         else:
             expiry = expiry_date
         
@@ -156,10 +160,10 @@ class GreeksCalculator:
         
         greeks_data = []
         
-        for _, option in option_data.iterrows():
-            K = option['strike']
-            market_price = option['ltp']
-            option_type = 'call' if option['type'] == 'CE' else 'put'
+        for option in option_data.itertuples(index=False):
+            K = option.strike
+            market_price = option.ltp
+            option_type = 'call' if option.type == 'CE' else 'put'
             
             # Calculate implied volatility first
             if market_price > 0 and T > 0:
@@ -184,7 +188,7 @@ class GreeksCalculator:
             
             greeks_data.append({
                 'strike': K,
-                'type': option['type'],
+                'type': option.type,
                 'ltp': market_price,
                 'theoretical_price': theoretical_price,
                 'delta': delta,
@@ -193,11 +197,11 @@ class GreeksCalculator:
                 'vega': vega,
                 'rho': rho,
                 'iv': iv * 100,  # Convert to percentage
-                'volume': option.get('volume', 0),
-                'oi': option.get('oi', 0),
-                'oi_change': option.get('oi_change', 0),
-                'bid': option.get('bid', 0),
-                'ask': option.get('ask', 0)
+                'volume': getattr(option, 'volume', 0),
+                'oi': getattr(option, 'oi', 0),
+                'oi_change': getattr(option, 'oi_change', 0),
+                'bid': getattr(option, 'bid', 0),
+                'ask': getattr(option, 'ask', 0)
             })
         
         return pd.DataFrame(greeks_data)
@@ -9,6 +9,8 @@ import sqlite3
 class TradeJournal:
     def __init__(self):
         self.db_path = 'data/trades.db'
+        # Bumped on every write so readers can tell when cached query results are stale
+        self.data_version = 0
         self.init_database()
         
     def init_database(self):
@@ -112,6 +114,7 @@ class TradeJournal:
             
             conn.commit()
             conn.close()
+            self.data_version += 1
             return True
             
         except Exception as e:
@@ -163,45 +166,61 @@ class TradeJournal:
             
             conn.commit()
             conn.close()
+            self.data_version += 1
             return True
             
         except Exception as e:
             print(f"Error logging trade exit: {e}")
             return False
     
-    def get_trade_history(self, days: int = 30, symbol: str = None, trade_type: str = None) -> pd.DataFrame:
-        """Get trade history as DataFrame"""
+    def _trade_history_query(self, days: int, symbol: str = None, trade_type: str = None,
+                             limit: Optional[int] = None):
+        """Build the trade history SQL and its parameters"""
+        query = '''
+            SELECT * FROM trades 
+            WHERE entry_time >= date('now', '-{} days')
+            AND action = 'ENTRY'
+        '''.format(days)
+        
+        params = []
+        
+        if symbol:
+            query += ' AND symbol = ?'
+            params.append(symbol)
+        
+        if trade_type:
+            query += ' AND trade_type = ?'
+            params.append(trade_type)
+        
+        query += ' ORDER BY entry_time DESC'
+        
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        
+        return query, params
+    
+    def _prepare_trade_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert raw trade rows to their DataFrame types"""
+        if not df.empty:
+            df['entry_time'] = pd.to_datetime(df['entry_time'])
+            df['exit_time'] = pd.to_datetime(df['exit_time'])
+            
+            # Parse parameters JSON
+            df['parameters'] = df['parameters'].apply(
+                lambda x: json.loads(x) if x and x != '{}' else {}
+            )
+        
+        return df
+    
+    def get_trade_history(self, days: int = 30, symbol: str = None, trade_type: str = None,
+                          limit: Optional[int] = None) -> pd.DataFrame:
+        """Get trade history as DataFrame, newest first (at most `limit` rows if given)"""
         try:
             conn = sqlite3.connect(self.db_path)
             
-            query = '''
-                SELECT * FROM trades 
-                WHERE entry_time >= date('now', '-{} days')
-                AND action = 'ENTRY'
-            '''.format(days)
-            
-            params = []
-            
-            if symbol:
-                query += ' AND symbol = ?'
-                params.append(symbol)
-            
-            if trade_type:
-                query += ' AND trade_type = ?'
-                params.append(trade_type)
-            
-            query += ' ORDER BY entry_time DESC'
-            
-            df = pd.read_sql_query(query, conn, params=params)
-            
-            if not df.empty:
-                df['entry_time'] = pd.to_datetime(df['entry_time'])
-                df['exit_time'] = pd.to_datetime(df['exit_time'])
-                
-                # Parse parameters JSON
-                df['parameters'] = df['parameters'].apply(
-                    lambda x: json.loads(x) if x and x != '{}' else {}
-                )
+            query, params = self._trade_history_query(days, symbol, trade_type, limit)
+            df = self._prepare_trade_history(pd.read_sql_query(query, conn, params=params))
             
             conn.close()
             return df
@@ -210,6 +229,23 @@ class TradeJournal:
             print(f"Error fetching trade history: {e}")
             return pd.DataFrame()
     
+    def iter_trade_history(self, days: int = 30, symbol: str = None, trade_type: str = None,
+                           chunksize: int = 5000):
+        """Yield trade history in DataFrame chunks of at most `chunksize` rows, newest first"""
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            
+            query, params = self._trade_history_query(days, symbol, trade_type)
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+                yield self._prepare_trade_history(chunk)
+            
+        except Exception as e:
+            print(f"Error streaming trade history: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+    
     def get_total_trades(self) -> int:
         """Get total number of trades"""
         try:
@@ -447,6 +483,7 @@ class TradeJournal:
             
             conn.commit()
             conn.close()
+            self.data_version += 1
             return True
             
         except Exception as e:
@@ -497,6 +534,7 @@ class TradeJournal:
             
             conn.commit()
             conn.close()
+            self.data_version += 1
             
             print(f"Cleaned up data older than {days} days")
             return True
@@ -2,20 +2,155 @@ import pandas as pd
 import numpy as np
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional
 from core.brokers.factory import BrokerFactory
 
+
+_INDEX_SYMBOLS = (
+    "NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "SENSEX",
+    "BANKEX", "NIFTYIT", "NIFTYPHARMA", "NIFTYAUTO", "NIFTYMETAL"
+)
+
+# Comprehensive NSE stock list (Top 200+ stocks), deduplicated and sorted once at import
+_STOCK_SYMBOLS = tuple(sorted(set((
+    # Nifty 50 stocks
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "HINDUNILVR", "ITC", "SBIN", 
+    "BHARTIARTL", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "SUNPHARMA",
+    "TITAN", "ULTRACEMCO", "BAJFINANCE", "NESTLEIND", "WIPRO", "HCLTECH", "TATAMOTORS",
+    "ONGC", "NTPC", "POWERGRID", "M&M", "ADANIENT", "JSWSTEEL", "TATASTEEL", "INDUSINDBK",
+    "BAJAJFINSV", "COALINDIA", "DRREDDY", "GRASIM", "HINDALCO", "TECHM", "CIPLA", "APOLLOHOSP",
+    "EICHERMOT", "BRITANNIA", "DIVISLAB", "ADANIPORTS", "TATACONSUM", "BPCL", "UPL", "HEROMOTOCO",
+    "SBILIFE", "BAJAJ-AUTO", "HDFCLIFE", "LTIM",
+
+    # Nifty Next 50
+    "ACC", "ADANIGREEN", "ADANITRANS", "AMBUJACEM", "BANDHANBNK", "BERGEPAINT", "BIOCON",
+    "BOSCHLTD", "COLPAL", "DABUR", "DLF", "GAIL", "GODREJCP", "HAVELLS", "HINDPETRO",
+    "ICICIPRULI", "INDIGO", "JINDALSTEL", "MCDOWELL-N", "NAUKRI", "NMDC", "PAGEIND",
+    "PETRONET", "PGHH", "PIDILITIND", "PNB", "SIEMENS", "TATAPOWER", "TORNTPHARM", "TRENT",
+    "VEDL", "VOLTAS", "ZOMATO", "ABB", "ALKEM", "AUROPHARMA", "BAJAJHLDNG", "BEL",
+
+    # Additional popular stocks
+    "PAYTM", "POLICYBZR", "DMART", "IRCTC", "SRF", "MOTHERSON", "CROMPTON", "DIXON",
+    "MAXHEALTH", "LICI", "JUBLFOOD", "PVR", "CANBK", "FEDERALBNK", "IDFCFIRSTB", "AUBANK",
+    "RBLBANK", "YESBANK", "M&MFIN", "SHRIRAMFIN", "CHOLAFIN", "PFC", "RECLTD", "IRFC",
+    "SUZLON", "ADANIPOWER", "TATAPOWER", "NHPC", "SJVN", "SAIL", "NMDC", "MOIL",
+
+    # IT & Tech
+    "PERSISTENT", "COFORGE", "MPHASIS", "LTTS", "TECHM", "MINDTREE", "CYIENT", "KPITTECH",
+
+    # Pharma
+    "LUPIN", "BIOCON", "GRANULES", "LALPATHLAB", "METROPOLIS", "THYROCARE",
+
+    # Auto & Auto Ancillary
+    "TVSMOTOR", "BAJAJ-AUTO", "HEROMOTOCO", "ASHOKLEY", "ESCORTS", "EXIDEIND", "MRF",
+    "APOLLOTYRE", "CEAT", "BALKRISIND", "MOTHERSON", "BOSCHLTD", "ENDURANCE",
+
+    # Banks & Financial Services
+    "BANKBARODA", "UNIONBANK", "IOB", "INDIANB", "CENTRALBK", "MAHABANK", "IIFL", "ICICIGI",
+    "SBICARD", "HDFCAMC", "MUTHOOTFIN", "MANAPPURAM", "LICHSGFIN",
+
+    # FMCG & Consumer
+    "MARICO", "GODREJCP", "VBL", "VARUN", "TATACONSUM", "PGHH", "COLPAL", "RADICO",
+
+    # Metals & Mining
+    "HINDZINC", "NATIONALUM", "VEDL", "COALINDIA", "NMDC", "SAIL", "JINDALSTEL", "JSWSTEEL",
+
+    # Cement
+    "ULTRACEMCO", "AMBUJACEM", "ACC", "SHREECEM", "RAMCOCEM", "JKCEMENT", "HEIDELBERG",
+
+    # Telecom & Media
+    "BHARTIARTL", "IDEA", "ZEEL", "SUNTV", "DISHTV", "NETWORK18",
+
+    # Retail & E-commerce  
+    "TRENT", "SHOPERSTOP", "VMART", "NYKAA", "POLICYBZR",
+
+    # Real Estate
+    "DLF", "GODREJPROP", "OBEROIRLTY", "BRIGADE", "PRESTIGE", "PHOENIXLTD",
+
+    # Infrastructure & Construction
+    "LT", "LARTOUROB", "NCC", "NBCC", "IRBINVIT", "IRB", "GMRINFRA"
+))))
+
+_EMPTY_FUNDAMENTALS = {'pe_ratio': 0, 'market_cap': 0, 'delivery_pct': 0}
+
+
+@lru_cache(maxsize=2)
+def _weekly_expiries(date_iso: str) -> tuple:
+    """Next four weekly (Thursday) expiry dates after the given ISO date"""
+    today = date.fromisoformat(date_iso)
+    days_ahead = 3 - today.weekday()  # Thursday is 3
+    if days_ahead <= 0:
+        days_ahead += 7
+    first_expiry = today + timedelta(days=days_ahead)
+    return tuple(pd.date_range(start=first_expiry, periods=4, freq='W-THU').strftime('%Y-%m-%d'))
+
+
+def _window_option_chain(df: pd.DataFrame, atm_price: Optional[float] = None,
+                         strikes_window: Optional[int] = None,
+                         columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Keep strikes within strikes_window of ATM and only the requested columns"""
+    if 'type' in df and not isinstance(df['type'].dtype, pd.CategoricalDtype):
+        # CE/PE as categorical codes: type comparisons become small-integer compares
+        df = df.assign(type=df['type'].astype('category'))
+    if strikes_window is not None and atm_price and not df.empty:
+        strikes = np.unique(df['strike'].to_numpy())
+        atm = int(np.abs(strikes - atm_price).argmin())
+        low = strikes[max(atm - strikes_window, 0)]
+        high = strikes[min(atm + strikes_window, len(strikes) - 1)]
+        df = df[df['strike'].between(low, high)]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def _empty_chart_data(bars: int = 20) -> Dict:
+    """Zero-filled chart payload of 5-minute bars ending 5 minutes before now"""
+    timestamps = pd.date_range(end=datetime.now() - timedelta(minutes=5), periods=bars, freq='5min')
+    return {
+        "timestamp": timestamps.to_pydatetime().tolist(),
+        "open": [0] * bars,
+        "high": [0] * bars,
+        "low": [0] * bars,
+        "close": [0] * bars,
+        "volume": [0] * bars,
+        "oi": [0] * bars
+    }
+
+
+def _max_pain_index(strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray) -> int:
+    """
+    Index of the strike with minimum total option-writer pain.
+    
+    Uses prefix sums so every strike is evaluated in one O(K) pass:
+    CE pain at K = K * sum(ce_oi below K) - sum(strike * ce_oi below K)
+    PE pain at K = sum(strike * pe_oi above K) - K * sum(pe_oi above K)
+    """
+    ce_k = ce_oi * strikes
+    pe_k = pe_oi * strikes
+    
+    ce_below = np.cumsum(ce_oi) - ce_oi
+    ce_k_below = np.cumsum(ce_k) - ce_k
+    pe_above = pe_oi.sum() - np.cumsum(pe_oi)
+    pe_k_above = pe_k.sum() - np.cumsum(pe_k)
+    
+    pain = strikes * ce_below - ce_k_below + pe_k_above - strikes * pe_above
+    return int(np.argmin(pain))
+
+
 class MarketData:
     """
     Market data handler using custom broker integrations
     Supports: Zerodha, Upstox, AngelOne, Nubra, Dhan
     """
     
-    def __init__(self, broker_name: str = None):
+    def __init__(self, broker_name: str = None, seed: Optional[int] = None):
         self.broker = None
         self.broker_name = broker_name
         self.mock_mode = True  # Start in mock mode, switch when broker authenticated
+        self._broker_live_ok: Optional[bool] = None  # Cached live-quote capability of broker
+        self._rng = np.random.default_rng(seed)  # Pass a seed for reproducible mock data
         
         # Initialize broker if specified
         if broker_name:
@@ -31,9 +166,20 @@ class MarketData:
             self.broker = broker
             self.broker_name = broker.broker_name
             self.mock_mode = False
+            self._broker_live_ok = None
             return True
         return False
     
+    def _broker_supports_live(self, symbol: str) -> bool:
+        """Probe the broker for live quotes once and cache the result per broker"""
+        if self._broker_live_ok is None:
+            data_source = self.get_live_price(symbol).get('data_source')
+            if data_source == 'broker_error':
+                # Transient failure - don't cache, probe again next time
+                return False
+            self._broker_live_ok = data_source == 'live'
+        return self._broker_live_ok
+    
     def load_mock_data(self):
         """Load mock data for testing without API"""
         mock_data_path = "data/mock_data.json"
@@ -48,6 +194,16 @@ class MarketData:
                 self.create_mock_data()
         else:
             self.create_mock_data()
+        
+        # Fundamentals are static for the lifetime of the mock data
+        self._fundamentals = {
+            symbol: {
+                'pe_ratio': stock_data.get('pe_ratio', 0),
+                'market_cap': stock_data.get('market_cap', 0),
+                'delivery_pct': stock_data.get('delivery_pct', 0)
+            }
+            for symbol, stock_data in self.mock_data.get("stocks", {}).items()
+        }
     
     def create_mock_data(self):
         """Create realistic mock market data"""
@@ -68,6 +224,7 @@ class MarketData:
         ]
         
         all_symbols = indices + stocks
+        rng = self._rng
         
         self.mock_data = {
             "indices": {},
@@ -86,11 +243,11 @@ class MarketData:
             }[symbol]
             
             self.mock_data["indices"][symbol] = {
-                "ltp": base_price + np.random.normal(0, 100),
-                "change": np.random.normal(0, 2),
-                "change_percent": np.random.normal(0, 1),
-                "volume": np.random.randint(1000000, 10000000),
-                "oi": np.random.randint(50000, 500000)
+                "ltp": base_price + rng.normal(0, 100),
+                "change": rng.normal(0, 2),
+                "change_percent": rng.normal(0, 1),
+                "volume": int(rng.integers(1000000, 10000000)),
+                "oi": int(rng.integers(50000, 500000))
             }
         
         # Generate mock stock data
@@ -103,15 +260,15 @@ class MarketData:
             }.get(symbol, 1000)
             
             self.mock_data["stocks"][symbol] = {
-                "ltp": base_price + np.random.normal(0, 20),
-                "change": np.random.normal(0, 15),
-                "change_percent": np.random.normal(0, 1.5),
-                "volume": np.random.randint(500000, 5000000),
-                "oi": np.random.randint(100000, 2000000),
-                "oi_change": np.random.randint(-50000, 50000),
-                "delivery_pct": np.random.uniform(30, 80),
-                "pe_ratio": np.random.uniform(15, 45),
-                "market_cap": np.random.uniform(100000, 1500000)
+                "ltp": base_price + rng.normal(0, 20),
+                "change": rng.normal(0, 15),
+                "change_percent": rng.normal(0, 1.5),
+                "volume": int(rng.integers(500000, 5000000)),
+                "oi": int(rng.integers(100000, 2000000)),
+                "oi_change": int(rng.integers(-50000, 50000)),
+                "delivery_pct": rng.uniform(30, 80),
+                "pe_ratio": rng.uniform(15, 45),
+                "market_cap": rng.uniform(100000, 1500000)
             }
             
         # Generate option chain for all symbols
@@ -133,130 +290,145 @@ class MarketData:
                 ce_data = {
                     "strike": strike,
                     "type": "CE",
-                    "ltp": max(0.5, base_price - strike + np.random.normal(0, 50)),
+                    "ltp": max(0.5, base_price - strike + rng.normal(0, 50)),
                     "bid": 0,
                     "ask": 0,
-                    "volume": np.random.randint(0, 100000),
-                    "oi": np.random.randint(0, 500000),
-                    "oi_change": np.random.randint(-10000, 10000),
-                    "iv": np.random.uniform(15, 35),
+                    "volume": int(rng.integers(0, 100000)),
+                    "oi": int(rng.integers(0, 500000)),
+                    "oi_change": int(rng.integers(-10000, 10000)),
+                    "iv": rng.uniform(15, 35),
                     "delta": max(0, min(1, 0.5 + (base_price - strike) / 1000)),
-                    "gamma": np.random.uniform(0.0001, 0.01),
-                    "theta": -np.random.uniform(1, 10),
-                    "vega": np.random.uniform(5, 50)
+                    "gamma": rng.uniform(0.0001, 0.01),
+                    "theta": -rng.uniform(1, 10),
+                    "vega": rng.uniform(5, 50)
                 }
                 
-                ce_data["bid"] = max(0.05, ce_data["ltp"] - np.random.uniform(0.5, 2))
-                ce_data["ask"] = ce_data["ltp"] + np.random.uniform(0.5, 2)
+                ce_data["bid"] = max(0.05, ce_data["ltp"] - rng.uniform(0.5, 2))
+                ce_data["ask"] = ce_data["ltp"] + rng.uniform(0.5, 2)
                 
                 # PE options
                 pe_data = {
                     "strike": strike,
                     "type": "PE",
-                    "ltp": max(0.5, strike - base_price + np.random.normal(0, 50)),
+                    "ltp": max(0.5, strike - base_price + rng.normal(0, 50)),
                     "bid": 0,
                     "ask": 0,
-                    "volume": np.random.randint(0, 100000),
-                    "oi": np.random.randint(0, 500000),
-                    "oi_change": np.random.randint(-10000, 10000),
-                    "iv": np.random.uniform(15, 35),
+                    "volume": int(rng.integers(0, 100000)),
+                    "oi": int(rng.integers(0, 500000)),
+                    "oi_change": int(rng.integers(-10000, 10000)),
+                    "iv": rng.uniform(15, 35),
                     "delta": -max(0, min(1, 0.5 - (base_price - strike) / 1000)),
-                    "gamma": np.random.uniform(0.0001, 0.01),
-                    "theta": -np.random.uniform(1, 10),
-                    "vega": np.random.uniform(5, 50)
+                    "gamma": rng.uniform(0.0001, 0.01),
+                    "theta": -rng.uniform(1, 10),
+                    "vega": rng.uniform(5, 50)
                 }
                 
-                pe_data["bid"] = max(0.05, pe_data["ltp"] - np.random.uniform(0.5, 2))
-                pe_data["ask"] = pe_data["ltp"] + np.random.uniform(0.5, 2)
+                pe_data["bid"] = max(0.05, pe_data["ltp"] - rng.uniform(0.5, 2))
+                pe_data["ask"] = pe_data["ltp"] + rng.uniform(0.5, 2)
                 
                 strikes.extend([ce_data, pe_data])
             
             self.mock_data["option_chain"][symbol] = strikes
         
-        # Generate historical data for all symbols
+        # Generate historical data for all symbols (100 one-minute bars, oldest first)
+        timestamps = pd.date_range(end=pd.Timestamp.now(), periods=100, freq='1min')
+        timestamps = timestamps.strftime('%Y-%m-%dT%H:%M:%S.%f').tolist()
+        wave = np.sin(np.arange(100) / 10)[::-1]
+        
         for symbol in all_symbols:
             if symbol in indices:
                 base_price = self.mock_data["indices"][symbol]["ltp"]
             else:
                 base_price = self.mock_data["stocks"][symbol]["ltp"]
             
-            timestamps = []
-            prices = []
-            volumes = []
-            ois = []
-            
-            current_time = datetime.now()
-            for i in range(100):
-                timestamps.append(current_time - timedelta(minutes=i))
-                prices.append(base_price + np.random.normal(0, 50) * np.sin(i/10))
-                volumes.append(np.random.randint(1000, 10000))
-                ois.append(np.random.randint(10000, 100000))
+            prices = base_price + rng.normal(0, 50, 100) * wave
             
+            # Chart-only series: float32 prices / int32 counts halve the resident size
             self.mock_data["historical"][symbol] = {
-                "timestamps": [ts.isoformat() for ts in reversed(timestamps)],
-                "open": [p + np.random.normal(0, 5) for p in reversed(prices)],
-                "high": [p + abs(np.random.normal(0, 20)) for p in reversed(prices)],
-                "low": [p - abs(np.random.normal(0, 20)) for p in reversed(prices)],
-                "close": list(reversed(prices)),
-                "volume": list(reversed(volumes)),
-                "oi": list(reversed(ois))
+                "timestamps": timestamps,
+                "open": (prices + rng.normal(0, 5, 100)).astype(np.float32),
+                "high": (prices + np.abs(rng.normal(0, 20, 100))).astype(np.float32),
+                "low": (prices - np.abs(rng.normal(0, 20, 100))).astype(np.float32),
+                "close": prices.astype(np.float32),
+                "volume": rng.integers(1000, 10000, 100, dtype=np.int32),
+                "oi": rng.integers(10000, 100000, 100, dtype=np.int32)
             }
     
     def get_live_price(self, symbol: str) -> Dict:
         """Get live price for a symbol using broker API or mock data"""
+        return self.get_live_prices([symbol])[symbol]
+    
+    def get_live_prices(self, symbols: List[str], exchange: str = "NSE") -> Dict[str, Dict]:
+        """
+        Get live prices for several symbols with a single broker request
+        
+        Symbols the broker doesn't return fall back to mock data, tagged
+        with the reason in 'data_source'.
+        """
         data_source = "mock"
+        quotes = {}
         
         # Try broker first if connected
         if not self.mock_mode and self.broker and self.broker.is_authenticated():
             try:
-                # Determine exchange based on symbol
-                exchange = "NSE" if symbol in self.get_available_symbols("stocks") else "NSE"
-                
-                quotes = self.broker.get_live_quotes([{"symbol": symbol, "exchange": exchange}])
-                
-                if quotes and symbol in quotes:
-                    result = quotes[symbol]
-                    result['data_source'] = 'live'
-                    return result
-                else:
-                    # Broker doesn't support live quotes yet
-                    data_source = "broker_unsupported"
+                quotes = self.broker.get_live_quotes(
+                    [{"symbol": symbol, "exchange": exchange} for symbol in symbols]
+                ) or {}
+                # Any symbol missing from the response isn't supported by the broker yet
+                data_source = "broker_unsupported"
             except Exception as e:
                 print(f"Broker quote error: {e}")
                 data_source = "broker_error"
         
-        # Use mock data with clear indicator
-        if symbol in self.mock_data["indices"]:
-            result = self.mock_data["indices"][symbol].copy()
-        elif symbol in self.mock_data["stocks"]:
-            result = self.mock_data["stocks"][symbol].copy()
-        else:
-            # Generate realistic mock data for unknown symbols
-            import random
-            base_price = random.randint(100, 25000)
-            change = random.uniform(-5, 5)
-            result = {
-                "ltp": base_price,
-                "change": base_price * (change/100),
-                "change_percent": change,
-                "volume": random.randint(10000, 10000000),
-                "oi": random.randint(1000, 500000)
-            }
+        results = {}
+        for symbol in symbols:
+            if symbol in quotes:
+                result = quotes[symbol]
+                result['data_source'] = 'live'
+                results[symbol] = result
+            else:
+                results[symbol] = self._mock_price(symbol, data_source)
+        return results
+    
+    def _mock_price(self, symbol: str, data_source: str) -> Dict:
+        """Mock quote for a symbol with a clear data-source indicator"""
+        quote = self.mock_data["indices"].get(symbol) or self.mock_data["stocks"].get(symbol)
+        if quote is not None:
+            # Build the result in one pass rather than copy-then-mutate
+            return {**quote, 'data_source': data_source}
         
-        result['data_source'] = data_source
-        return result
+        # Generate realistic mock data for unknown symbols
+        rng = self._rng
+        base_price = int(rng.integers(100, 25001))
+        change = rng.uniform(-5, 5)
+        return {
+            "ltp": base_price,
+            "change": base_price * (change/100),
+            "change_percent": change,
+            "volume": int(rng.integers(10000, 10000001)),
+            "oi": int(rng.integers(1000, 500001)),
+            "data_source": data_source
+        }
     
-    def get_option_chain(self, symbol: str, expiry: str) -> pd.DataFrame:
-        """Get option chain data for a symbol and expiry"""
+    def get_option_chain(self, symbol: str, expiry: str, atm_price: Optional[float] = None,
+                         strikes_window: Optional[int] = None,
+                         columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get option chain data for a symbol and expiry
+        
+        Args:
+            atm_price: Underlying price used to centre strikes_window
+            strikes_window: Keep only this many strikes either side of ATM
+            columns: Keep only these columns (missing ones are skipped)
+        """
         # Use broker API if available and supports live data
         if not self.mock_mode and self.broker and self.broker.is_authenticated():
-            # Check if broker supports live quotes
-            test_quote = self.get_live_price(symbol)
-            if test_quote.get('data_source') == 'live':
+            # Check if broker supports live quotes (probed once per broker)
+            if self._broker_supports_live(symbol):
                 try:
                     df = self.broker.get_option_chain(symbol, expiry)
                     if not df.empty:
-                        return df
+                        return _window_option_chain(df, atm_price, strikes_window, columns)
                 except Exception as e:
                     print(f"Option chain error: {e}")
         
@@ -264,7 +436,7 @@ class MarketData:
         if symbol in self.mock_data["option_chain"]:
             data = self.mock_data["option_chain"][symbol]
             df = pd.DataFrame(data)
-            return df
+            return _window_option_chain(df, atm_price, strikes_window, columns)
         else:
             return pd.DataFrame()
     
@@ -281,12 +453,12 @@ class MarketData:
         """
         # Use broker API if available and supports live data
         if not self.mock_mode and self.broker and self.broker.is_authenticated():
-            # Check if broker supports live quotes
-            test_quote = self.get_live_price(symbol)
-            if test_quote.get('data_source') == 'live':
+            # Check if broker supports live quotes (probed once per broker)
+            if self._broker_supports_live(symbol):
                 try:
-                    to_date = datetime.now().strftime("%Y-%m-%d")
-                    from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+                    now = datetime.now()
+                    to_date = now.strftime("%Y-%m-%d")
+                    from_date = (now - timedelta(days=days)).strftime("%Y-%m-%d")
                     
                     df = self.broker.get_historical_data(symbol, from_date, to_date, interval, exchange)
                     if not df.empty:
@@ -311,50 +483,36 @@ class MarketData:
     def get_expiry_dates(self, symbol: str) -> List[str]:
         """Get available expiry dates for a symbol"""
         if self.mock_mode:
-            # Generate mock expiry dates
-            today = datetime.now()
-            expiries = []
-            
-            # Weekly expiries for next 4 weeks
-            for i in range(4):
-                # Find next Thursday
-                days_ahead = 3 - today.weekday()  # Thursday is 3
-                if days_ahead <= 0:
-                    days_ahead += 7
-                expiry_date = today + timedelta(days=days_ahead + (i * 7))
-                expiries.append(expiry_date.strftime("%Y-%m-%d"))
-            
-            return expiries
+            # Weekly expiries for next 4 weeks, computed once per day
+            return list(_weekly_expiries(date.today().isoformat()))
         
         # Broker API would return expiries
         return []
     
-    def get_chart_data(self, symbol: str, timeframe: str = "5minute") -> Dict:
-        """Get historical chart data"""
+    def get_chart_data(self, symbol: str, timeframe: str = "5minute",
+                       return_numpy: bool = True) -> Dict:
+        """
+        Get historical chart data
+        
+        Series are returned as NumPy arrays (plotly consumes them natively)
+        unless return_numpy is False, in which case plain lists are returned.
+        """
         if self.mock_mode:
             if symbol in self.mock_data["historical"]:
                 data = self.mock_data["historical"][symbol]
-                return {
-                    "timestamp": [datetime.fromisoformat(ts) for ts in data["timestamps"]],
-                    "open": data["open"],
-                    "high": data["high"],
-                    "low": data["low"],
-                    "close": data["close"],
-                    "volume": data["volume"],
-                    "oi": data["oi"]
+                chart = {
+                    "timestamp": pd.to_datetime(data["timestamps"]).to_pydatetime(),
+                    "open": np.asarray(data["open"]),
+                    "high": np.asarray(data["high"]),
+                    "low": np.asarray(data["low"]),
+                    "close": np.asarray(data["close"]),
+                    "volume": np.asarray(data["volume"]),
+                    "oi": np.asarray(data["oi"])
                 }
+                return chart if return_numpy else {k: v.tolist() for k, v in chart.items()}
             else:
                 # Return empty structure with proper keys
-                now = datetime.now()
-                return {
-                    "timestamp": [now - timedelta(minutes=i*5) for i in range(20, 0, -1)],
-                    "open": [0] * 20,
-                    "high": [0] * 20,
-                    "low": [0] * 20,
-                    "close": [0] * 20,
-                    "volume": [0] * 20,
-                    "oi": [0] * 20
-                }
+                return _empty_chart_data()
         
         # Use get_historical_data for real data
         interval_map = {
@@ -369,44 +527,40 @@ class MarketData:
         df = self.get_historical_data(symbol, interval=interval, days=7)
         
         if not df.empty:
-            return {
-                "timestamp": df['timestamp'].tolist(),
-                "open": df['open'].tolist(),
-                "high": df['high'].tolist(),
-                "low": df['low'].tolist(),
-                "close": df['close'].tolist(),
-                "volume": df['volume'].tolist(),
-                "oi": df.get('oi', [0] * len(df)).tolist()
+            chart = {
+                "timestamp": df['timestamp'].to_numpy(),
+                "open": df['open'].to_numpy(),
+                "high": df['high'].to_numpy(),
+                "low": df['low'].to_numpy(),
+                "close": df['close'].to_numpy(),
+                "volume": df['volume'].to_numpy(),
+                "oi": df['oi'].to_numpy() if 'oi' in df.columns else np.zeros(len(df), dtype=np.int64)
             }
+            if return_numpy:
+                return chart
+            # datetime64 arrays list to raw ints, so take timestamps from pandas
+            return {**{k: v.tolist() for k, v in chart.items()}, "timestamp": df['timestamp'].tolist()}
         
         # Return empty structure with proper keys when no data available
-        now = datetime.now()
-        return {
-            "timestamp": [now - timedelta(minutes=i*5) for i in range(20, 0, -1)],
-            "open": [0] * 20,
-            "high": [0] * 20,
-            "low": [0] * 20,
-            "close": [0] * 20,
-            "volume": [0] * 20,
-            "oi": [0] * 20
-        }
+        return _empty_chart_data()
     
     def get_top_gainers_losers(self) -> Dict[str, List]:
         """Get top gainers and losers"""
+        symbols = ["RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", 
+                  "ICICIBANK", "SBIN", "BHARTIARTL", "KOTAKBANK", "ITC"]
+        
         if self.mock_mode:
             # Generate mock top gainers/losers
-            symbols = ["RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", 
-                      "ICICIBANK", "SBIN", "BHARTIARTL", "KOTAKBANK", "ITC"]
-            
+            rng = self._rng
             gainers = []
             losers = []
             
             for symbol in symbols[:5]:
-                change = np.random.uniform(2, 8)
+                change = rng.uniform(2, 8)
                 gainers.append((symbol, change))
             
             for symbol in symbols[5:]:
-                change = np.random.uniform(-8, -2)
+                change = rng.uniform(-8, -2)
                 losers.append((symbol, change))
             
             return {
@@ -414,125 +568,49 @@ class MarketData:
                 "losers": sorted(losers, key=lambda x: x[1])
             }
         
-        # Broker API would return top movers
-        return {"gainers": [], "losers": []}
+        # One batched broker request for the whole watchlist
+        quotes = self.get_live_prices(symbols)
+        movers = [
+            (symbol, quote.get('change_percent', 0))
+            for symbol, quote in quotes.items()
+            if quote.get('data_source') == 'live'
+        ]
+        
+        return {
+            "gainers": sorted([m for m in movers if m[1] > 0], key=lambda x: x[1], reverse=True)[:5],
+            "losers": sorted([m for m in movers if m[1] < 0], key=lambda x: x[1])[:5]
+        }
     
     def get_available_symbols(self, symbol_type: str = "all") -> List[str]:
         """Get list of available symbols"""
-        # All major indices
-        indices = [
-            "NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "SENSEX",
-            "BANKEX", "NIFTYIT", "NIFTYPHARMA", "NIFTYAUTO", "NIFTYMETAL"
-        ]
-        
-        # Comprehensive NSE stock list (Top 200+ stocks)
-        stocks = [
-            # Nifty 50 stocks
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "HINDUNILVR", "ITC", "SBIN", 
-            "BHARTIARTL", "KOTAKBANK", "LT", "AXISBANK", "ASIANPAINT", "MARUTI", "SUNPHARMA",
-            "TITAN", "ULTRACEMCO", "BAJFINANCE", "NESTLEIND", "WIPRO", "HCLTECH", "TATAMOTORS",
-            "ONGC", "NTPC", "POWERGRID", "M&M", "ADANIENT", "JSWSTEEL", "TATASTEEL", "INDUSINDBK",
-            "BAJAJFINSV", "COALINDIA", "DRREDDY", "GRASIM", "HINDALCO", "TECHM", "CIPLA", "APOLLOHOSP",
-            "EICHERMOT", "BRITANNIA", "DIVISLAB", "ADANIPORTS", "TATACONSUM", "BPCL", "UPL", "HEROMOTOCO",
-            "SBILIFE", "BAJAJ-AUTO", "HDFCLIFE", "LTIM",
-            
-            # Nifty Next 50
-            "ACC", "ADANIGREEN", "ADANITRANS", "AMBUJACEM", "BANDHANBNK", "BERGEPAINT", "BIOCON",
-            "BOSCHLTD", "COLPAL", "DABUR", "DLF", "GAIL", "GODREJCP", "HAVELLS", "HINDPETRO",
-            "ICICIPRULI", "INDIGO", "JINDALSTEL", "MCDOWELL-N", "NAUKRI", "NMDC", "PAGEIND",
-            "PETRONET", "PGHH", "PIDILITIND", "PNB", "SIEMENS", "TATAPOWER", "TORNTPHARM", "TRENT",
-            "VEDL", "VOLTAS", "ZOMATO", "ABB", "ALKEM", "AUROPHARMA", "BAJAJHLDNG", "BEL",
-            
-            # Additional popular stocks
-            "PAYTM", "POLICYBZR", "DMART", "IRCTC", "SRF", "MOTHERSON", "CROMPTON", "DIXON",
-            "MAXHEALTH", "LICI", "JUBLFOOD", "PVR", "CANBK", "FEDERALBNK", "IDFCFIRSTB", "AUBANK",
-            "RBLBANK", "YESBANK", "M&MFIN", "SHRIRAMFIN", "CHOLAFIN", "PFC", "RECLTD", "IRFC",
-            "SUZLON", "ADANIPOWER", "TATAPOWER", "NHPC", "SJVN", "SAIL", "NMDC", "MOIL",
-            
-            # IT & Tech
-            "PERSISTENT", "COFORGE", "MPHASIS", "LTTS", "TECHM", "MINDTREE", "CYIENT", "KPITTECH",
-            
-            # Pharma
-            "LUPIN", "BIOCON", "GRANULES", "LALPATHLAB", "METROPOLIS", "THYROCARE",
-            
-            # Auto & Auto Ancillary
-            "TVSMOTOR", "BAJAJ-AUTO", "HEROMOTOCO", "ASHOKLEY", "ESCORTS", "EXIDEIND", "MRF",
-            "APOLLOTYRE", "CEAT", "BALKRISIND", "MOTHERSON", "BOSCHLTD", "ENDURANCE",
-            
-            # Banks & Financial Services
-            "BANKBARODA", "UNIONBANK", "IOB", "INDIANB", "CENTRALBK", "MAHABANK", "IIFL", "ICICIGI",
-            "SBICARD", "HDFCAMC", "MUTHOOTFIN", "MANAPPURAM", "LICHSGFIN",
-            
-            # FMCG & Consumer
-            "MARICO", "GODREJCP", "VBL", "VARUN", "TATACONSUM", "PGHH", "COLPAL", "RADICO",
-            
-            # Metals & Mining
-            "HINDZINC", "NATIONALUM", "VEDL", "COALINDIA", "NMDC", "SAIL", "JINDALSTEL", "JSWSTEEL",
-            
-            # Cement
-            "ULTRACEMCO", "AMBUJACEM", "ACC", "SHREECEM", "RAMCOCEM", "JKCEMENT", "HEIDELBERG",
-            
-            # Telecom & Media
-            "BHARTIARTL", "IDEA", "ZEEL", "SUNTV", "DISHTV", "NETWORK18",
-            
-            # Retail & E-commerce  
-            "TRENT", "SHOPERSTOP", "VMART", "NYKAA", "POLICYBZR",
-            
-            # Real Estate
-            "DLF", "GODREJPROP", "OBEROIRLTY", "BRIGADE", "PRESTIGE", "PHOENIXLTD",
-            
-            # Infrastructure & Construction
-            "LT", "LARTOUROB", "NCC", "NBCC", "IRBINVIT", "IRB", "GMRINFRA"
-        ]
-        
-        # Remove duplicates and sort
-        stocks = sorted(list(set(stocks)))
-        
         if symbol_type == "indices":
-            return indices
+            return list(_INDEX_SYMBOLS)
         elif symbol_type == "stocks":
-            return stocks
+            return list(_STOCK_SYMBOLS)
         else:
-            return indices + stocks
+            return list(_INDEX_SYMBOLS + _STOCK_SYMBOLS)
     
     def get_stock_fundamentals(self, symbol: str) -> Dict:
         """Get stock fundamentals like P/E, Market Cap, etc."""
-        if symbol in self.mock_data.get("stocks", {}):
-            stock_data = self.mock_data["stocks"][symbol]
-            return {
-                'pe_ratio': stock_data.get('pe_ratio', 0),
-                'market_cap': stock_data.get('market_cap', 0),
-                'delivery_pct': stock_data.get('delivery_pct', 0)
-            }
-        return {'pe_ratio': 0, 'market_cap': 0, 'delivery_pct': 0}
+        return self._fundamentals.get(symbol, _EMPTY_FUNDAMENTALS)
     
     def calculate_max_pain(self, option_chain: pd.DataFrame) -> float:
         """Calculate max pain point from option chain"""
         if option_chain.empty:
             return 0
         
-        strikes = option_chain['strike'].unique()
-        max_pain = 0
-        min_pain_value = float('inf')
+        # Aggregate CE/PE open interest per unique (sorted) strike
+        strike_col = option_chain['strike'].to_numpy(dtype=np.float64)
+        oi = np.nan_to_num(option_chain['oi'].to_numpy(dtype=np.float64))
+        option_type = option_chain['type'].to_numpy()
         
-        for strike in strikes:
-            pain = 0
-            
-            # Calculate pain for CE holders
-            ce_options = option_chain[(option_chain['type'] == 'CE') & (option_chain['strike'] < strike)]
-            for _, opt in ce_options.iterrows():
-                pain += (strike - opt['strike']) * opt['oi']
-            
-            # Calculate pain for PE holders
-            pe_options = option_chain[(option_chain['type'] == 'PE') & (option_chain['strike'] > strike)]
-            for _, opt in pe_options.iterrows():
-                pain += (opt['strike'] - strike) * opt['oi']
-            
-            if pain < min_pain_value:
-                min_pain_value = pain
-                max_pain = strike
+        strikes, strike_idx = np.unique(strike_col, return_inverse=True)
+        ce_oi = np.bincount(strike_idx, weights=np.where(option_type == 'CE', oi, 0.0),
+                            minlength=len(strikes))
+        pe_oi = np.bincount(strike_idx, weights=np.where(option_type == 'PE', oi, 0.0),
+                            minlength=len(strikes))
         
-        return max_pain
+        return float(strikes[_max_pain_index(strikes, ce_oi, pe_oi)])
     
     def get_broker_status(self) -> Dict:
         """Get current broker connection status"""
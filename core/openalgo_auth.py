@@ -1,26 +1,214 @@
 import os
+import socket
+import threading
+import time
 import requests
 import json
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # Optional: faster JSON encode/decode on the request hot path
+except ImportError:
+    orjson = None
+
+# OpenAlgo REST endpoints (under /api/v1)
+_ENDPOINTS = (
+    'funds', 'positions', 'orderbook', 'placeorder', 'cancelorder', 'quotes',
+    'multiquotes', 'depth', 'closeposition', 'brokerinfo', 'history', 'intervals',
+    'placesmartorder', 'positionbook'
+)
+
+# Read-only POST endpoints polled per tick; sent through urllib3 directly
+_HOT_ENDPOINTS = frozenset(['quotes', 'multiquotes', 'depth', 'history'])
+
+# Cache lifetimes (seconds) for idempotent GET endpoints
+CACHE_TTL = {
+    'intervals': 3600,
+    'broker_info': 300,
+    'funds': 2,
+    'positions': 0.5,
+    'orderbook': 0.5
+}
+
+# Characters of a non-200 response body kept in the failure message (error pages can be long HTML)
+_ERROR_BODY_LIMIT = 200
+
+
+def _json(response: requests.Response) -> Any:
+    """Decode a response body as JSON"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _loads(body: bytes) -> Any:
+    """Decode a raw JSON body"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _failure_message(failure: str, status_code: int, body: str) -> str:
+    """Failure message for a non-200 response: status code, then the start of the body"""
+    body = body.strip()
+    if not body:
+        return f'{failure}: {status_code}'
+    if len(body) > _ERROR_BODY_LIMIT:
+        body = body[:_ERROR_BODY_LIMIT] + '...'
+    return f'{failure}: {status_code} {body}'
+
+
+def _dumps(payload: Any) -> bytes:
+    """Encode a request body as JSON (Content-Type is set on the session)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+# TCP keepalive on pooled sockets so idle connections survive broker/NAT idle timeouts
+_KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (('TCP_KEEPIDLE', 30), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+]
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections enable TCP keepalive"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = _KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
 
 class OpenAlgoAuth:
     def __init__(self):
         self.api_key = os.getenv("OPENALGO_API_KEY", "")
         self.host = os.getenv("OPENALGO_HOST", "http://127.0.0.1:5000")
         self.session = requests.Session()
+        # Pooled keep-alive connections for concurrent fan-out, with backoff on
+        # gateway errors. Only GETs are retried: POST also places orders.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(["GET"])
+        )
+        adapter = _KeepAliveAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        # Bare urllib3 pool for hot read-only endpoints, skipping requests' per-call
+        # overhead. These POSTs don't mutate state, so they are safe to retry.
+        self._pool = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=32,
+            headers={'Content-Type': 'application/json'},
+            retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=frozenset(["POST"])
+            ),
+            socket_options=_KEEPALIVE_SOCKET_OPTIONS
+        )
+        self._update_auth_header()
+        self._build_urls()
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_generation = 0  # Bumped by invalidate(); fetches started before it are not cached
+        self._bucket = TokenBucket(rate=10, capacity=20)
         self.authenticated = False
         
     def set_credentials(self, api_key: str, host: str = None):
         self.api_key = api_key
         if host:
             self.host = host
+            self._build_urls()
+        self._update_auth_header()
+        self.invalidate()
         self.authenticated = True
+    
+    def prewarm(self):
+        """
+        Open a pooled connection in the background so the first real call
+        doesn't pay DNS + TCP (+TLS) setup; also caches the intervals list.
+        
+        Does network I/O, so it is never called implicitly: connect code calls
+        it once after set_credentials.
+        """
+        threading.Thread(target=self.get_intervals, daemon=True).start()
+    
+    def set_rate_limit(self, rate: float, capacity: int):
+        """Limit outgoing API requests to `rate` per second with bursts up to `capacity`"""
+        self._bucket = TokenBucket(rate=rate, capacity=capacity)
+    
+    def _cached_get(self, key: str, fetch: Callable[[], Dict]) -> Dict:
+        """Return a cached response younger than CACHE_TTL[key], else fetch and cache it"""
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < CACHE_TTL[key]:
+            return cached[1]
+        
+        generation = self._cache_generation
+        result = fetch()
+        # An invalidate() during the fetch means the response may predate it
+        if result.get('success') and generation == self._cache_generation:
+            self._cache[key] = (time.monotonic(), result)
+        return result
+    
+    def invalidate(self, *keys: str):
+        """Drop cached responses for the given keys, or everything if none given"""
+        self._cache_generation += 1
+        if keys:
+            for key in keys:
+                self._cache.pop(key, None)
+        else:
+            self._cache.clear()
+    
+    def _build_urls(self):
+        """Precompute full endpoint URLs for the current host"""
+        self._urls = {name: f"{self.host}/api/v1/{name}" for name in _ENDPOINTS}
+    
+    def _update_auth_header(self):
+        """Keep the session's Authorization header in sync with the API key"""
+        self.session.headers['Authorization'] = f'Bearer {self.api_key}'
+        self._pool.headers['Authorization'] = f'Bearer {self.api_key}'
         
     def get_headers(self) -> Dict[str, str]:
+        """Auth headers; requests already carry these via the session"""
         return {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
+            'Authorization': self.session.headers['Authorization'],
+            'Content-Type': self.session.headers['Content-Type']
         }
     
     def verify_connection(self) -> Dict:
@@ -32,8 +220,7 @@ class OpenAlgoAuth:
                 }
             
             response = self.session.get(
-                f"{self.host}/api/v1/funds",
-                headers=self.get_headers(),
+                self._urls['funds'],
                 timeout=10
             )
             
@@ -42,7 +229,7 @@ class OpenAlgoAuth:
                 return {
                     'success': True,
                     'message': 'Connected to OpenAlgo successfully',
-                    'data': response.json()
+                    'data': _json(response)
                 }
             elif response.status_code == 401:
                 return {
@@ -66,244 +253,166 @@ class OpenAlgoAuth:
                 'message': f'Connection error: {str(e)}'
             }
     
-    def get_funds(self) -> Dict:
+    def _request(self, method: str, path: str, failure: str, error: str,
+                 payload: Any = None, timeout: int = 10) -> Dict:
+        """
+        Send a request to an OpenAlgo endpoint and wrap the outcome
+        
+        Args:
+            method: HTTP method ('GET' or 'POST')
+            path: Endpoint name under /api/v1 (e.g. 'funds')
+            failure: Message prefix for non-200 responses
+            error: Message prefix for exceptions
+            payload: JSON body for POST requests
+            timeout: Request timeout in seconds
+        
+        Returns:
+            Dict with 'success' and either 'data' or 'message'
+            ('status_code' is included when the server answered non-200)
+        """
+        self._bucket.acquire()
+        if method == 'POST' and path in _HOT_ENDPOINTS:
+            return self._raw_post(path, failure, error, payload, timeout)
+        
         try:
-            response = self.session.get(
-                f"{self.host}/api/v1/funds",
-                headers=self.get_headers(),
-                timeout=10
+            response = self.session.request(
+                method,
+                self._urls[path],
+                data=None if payload is None else _dumps(payload),
+                timeout=timeout
             )
             
             if response.status_code == 200:
                 return {
                     'success': True,
-                    'data': response.json()
+                    'data': _json(response)
                 }
             else:
                 return {
                     'success': False,
-                    'message': f'Failed to fetch funds: {response.status_code}'
+                    'status_code': response.status_code,
+                    'message': _failure_message(failure, response.status_code, response.text)
                 }
                 
         except Exception as e:
             return {
                 'success': False,
-                'message': f'Error fetching funds: {str(e)}'
+                'message': f'{error}: {str(e)}'
             }
     
-    def get_positions(self) -> Dict:
+    def _raw_post(self, path: str, failure: str, error: str,
+                  payload: Any, timeout: int) -> Dict:
+        """
+        POST through the bare urllib3 pool (same contract as _request)
+        
+        The body is read once straight off the socket and the connection
+        released, so large history payloads aren't buffered twice.
+        """
         try:
-            response = self.session.get(
-                f"{self.host}/api/v1/positions",
-                headers=self.get_headers(),
-                timeout=10
+            response = self._pool.request(
+                'POST',
+                self._urls[path],
+                body=_dumps(payload),
+                timeout=timeout,
+                preload_content=False
             )
+            try:
+                body = response.read()
+            finally:
+                response.release_conn()
             
-            if response.status_code == 200:
+            if response.status == 200:
                 return {
                     'success': True,
-                    'data': response.json()
+                    'data': _loads(body)
                 }
             else:
                 return {
                     'success': False,
-                    'message': f'Failed to fetch positions: {response.status_code}'
+                    'status_code': response.status,
+                    'message': _failure_message(failure, response.status,
+                                                body.decode('utf-8', errors='replace'))
                 }
                 
         except Exception as e:
             return {
                 'success': False,
-                'message': f'Error fetching positions: {str(e)}'
+                'message': f'{error}: {str(e)}'
             }
     
+    def get_funds(self) -> Dict:
+        return self._cached_get('funds', lambda: self._request(
+            'GET', 'funds', 'Failed to fetch funds', 'Error fetching funds'))
+    
+    def get_positions(self) -> Dict:
+        return self._cached_get('positions', lambda: self._request(
+            'GET', 'positions', 'Failed to fetch positions', 'Error fetching positions'))
+    
     def get_orderbook(self) -> Dict:
-        try:
-            response = self.session.get(
-                f"{self.host}/api/v1/orderbook",
-                headers=self.get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch orderbook: {response.status_code}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching orderbook: {str(e)}'
-            }
+        return self._cached_get('orderbook', lambda: self._request(
+            'GET', 'orderbook', 'Failed to fetch orderbook', 'Error fetching orderbook'))
     
     def place_order(self, order_params: Dict) -> Dict:
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/placeorder",
-                headers=self.get_headers(),
-                json=order_params,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Order placement failed: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error placing order: {str(e)}'
-            }
+        result = self._request('POST', 'placeorder', 'Order placement failed',
+                               'Error placing order', payload=order_params)
+        self.invalidate('funds', 'positions', 'orderbook')
+        return result
     
     def cancel_order(self, order_id: str) -> Dict:
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/cancelorder",
-                headers=self.get_headers(),
-                json={'orderid': order_id},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Order cancellation failed: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error cancelling order: {str(e)}'
-            }
+        result = self._request('POST', 'cancelorder', 'Order cancellation failed',
+                               'Error cancelling order', payload={'orderid': order_id})
+        self.invalidate('funds', 'positions', 'orderbook')
+        return result
     
     def get_quotes(self, symbol: str, exchange: str = "NSE") -> Dict:
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/quotes",
-                headers=self.get_headers(),
-                json={
-                    'symbol': symbol,
-                    'exchange': exchange
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch quotes: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching quotes: {str(e)}'
-            }
+        return self._request('POST', 'quotes', 'Failed to fetch quotes', 'Error fetching quotes',
+                             payload={'symbol': symbol, 'exchange': exchange})
+    
+    def get_multi_quotes(self, symbols: List[Dict]) -> Dict:
+        """
+        Get quotes for several symbols in one request
+        
+        Args:
+            symbols: List of dicts with 'symbol' and 'exchange'
+        
+        Returns:
+            Dict with 'success' and 'data' mapping symbol -> quote data
+        """
+        result = self._request('POST', 'multiquotes', 'Failed to fetch quotes',
+                               'Error fetching quotes', payload={'symbols': symbols})
+        if not result['success']:
+            return result
+        
+        payload = result['data']
+        results = payload.get('results', []) if isinstance(payload, dict) else []
+        return {
+            'success': bool(results),
+            'data': {item.get('symbol'): item.get('data', item) for item in results},
+            'message': '' if results else 'Empty multiquotes response'
+        }
     
     def get_depth(self, symbol: str, exchange: str = "NSE") -> Dict:
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/depth",
-                headers=self.get_headers(),
-                json={
-                    'symbol': symbol,
-                    'exchange': exchange
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch market depth: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching market depth: {str(e)}'
-            }
+        return self._request('POST', 'depth', 'Failed to fetch market depth',
+                             'Error fetching market depth',
+                             payload={'symbol': symbol, 'exchange': exchange})
     
     def close_all_positions(self) -> Dict:
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/closeposition",
-                headers=self.get_headers(),
-                json={},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to close positions: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error closing positions: {str(e)}'
-            }
+        result = self._request('POST', 'closeposition', 'Failed to close positions',
+                               'Error closing positions', payload={})
+        self.invalidate('funds', 'positions', 'orderbook')
+        return result
     
     def get_broker_info(self) -> Dict:
-        try:
-            response = self.session.get(
-                f"{self.host}/api/v1/brokerinfo",
-                headers=self.get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'success': True,
-                    'broker': data.get('broker', 'Unknown'),
-                    'user': data.get('user', 'Unknown'),
-                    'data': data
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch broker info: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching broker info: {str(e)}'
-            }
+        return self._cached_get('broker_info', self._fetch_broker_info)
+    
+    def _fetch_broker_info(self) -> Dict:
+        result = self._request('GET', 'brokerinfo', 'Failed to fetch broker info',
+                               'Error fetching broker info')
+        if result['success']:
+            data = result['data']
+            result['broker'] = data.get('broker', 'Unknown')
+            result['user'] = data.get('user', 'Unknown')
+        return result
     
     def is_connected(self) -> bool:
         return self.authenticated and bool(self.api_key)
@@ -323,114 +432,33 @@ class OpenAlgoAuth:
         Returns:
             Dict with historical data (OHLC, volume, OI)
         """
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/history",
-                headers=self.get_headers(),
-                json={
-                    'symbol': symbol,
-                    'exchange': exchange,
-                    'interval': interval,
-                    'start_date': start_date,
-                    'end_date': end_date
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch historical data: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching historical data: {str(e)}'
-            }
+        return self._request(
+            'POST', 'history', 'Failed to fetch historical data', 'Error fetching historical data',
+            payload={
+                'symbol': symbol,
+                'exchange': exchange,
+                'interval': interval,
+                'start_date': start_date,
+                'end_date': end_date
+            },
+            timeout=30
+        )
     
     def get_intervals(self) -> Dict:
         """Get supported time intervals for historical data"""
-        try:
-            response = self.session.get(
-                f"{self.host}/api/v1/intervals",
-                headers=self.get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch intervals: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching intervals: {str(e)}'
-            }
+        return self._cached_get('intervals', lambda: self._request(
+            'GET', 'intervals', 'Failed to fetch intervals', 'Error fetching intervals'))
     
     def place_smart_order(self, order_params: Dict) -> Dict:
         """
         Place smart order with position-aware sizing
         """
-        try:
-            response = self.session.post(
-                f"{self.host}/api/v1/placesmartorder",
-                headers=self.get_headers(),
-                json=order_params,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Smart order placement failed: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error placing smart order: {str(e)}'
-            }
+        result = self._request('POST', 'placesmartorder', 'Smart order placement failed',
+                               'Error placing smart order', payload=order_params)
+        self.invalidate('funds', 'positions', 'orderbook')
+        return result
     
     def get_position_book(self) -> Dict:
         """Get position book via OpenAlgo API"""
-        try:
-            response = self.session.get(
-                f"{self.host}/api/v1/positionbook",
-                headers=self.get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return {
-                    'success': True,
-                    'data': response.json()
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'Failed to fetch position book: {response.text}'
-                }
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'message': f'Error fetching position book: {str(e)}'
-            }
+        return self._request('GET', 'positionbook', 'Failed to fetch position book',
+                             'Error fetching position book')
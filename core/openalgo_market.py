@@ -1,41 +1,185 @@
+import time
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from collections import ChainMap
+from functools import lru_cache, wraps
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
 from core.openalgo_auth import OpenAlgoAuth
 
+# Brokers OpenAlgo can route to
+SUPPORTED_BROKERS: Tuple[str, ...] = (
+    "Zerodha", "AngelOne", "Upstox", "Fyers", "Dhan", 
+    "Flattrade", "Shoonya", "AliceBlue", "5Paisa", "IIFL", 
+    "Kotak Securities", "Paytm", "Groww", "Firstock", 
+    "Motilal Oswal", "Tradejini", "IndMoney", "Zebu", 
+    "Wisdom", "Pocketful", "Definedge", "Compositedge", 
+    "Ibulls", "Fivepaisaxts", "Dhan Sandbox"
+)
+
+# Quotes younger than this (seconds) are served from the last-tick cache
+TICK_MAX_AGE = 1.0
+
+# Concurrent quote requests per option chain (kept below the session's pool size)
+QUOTE_FETCH_WORKERS = 16
+
+# Typed columns for OHLC bars; anything else falls back to pandas inference
+_PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+_COUNT_COLUMNS = ('volume', 'oi')
+
+# HTTP statuses meaning the server has no multiquotes endpoint (anything else may be transient)
+_UNSUPPORTED_STATUSES = frozenset([404, 405, 501])
+
+
+class _Projection:
+    """
+    Maps known source keys to output keys with defaults
+    
+    Built from (output key, source key, default) triples. Uses a single
+    C-level itemgetter call per record, falling back to a ChainMap over
+    the defaults only when some keys are missing.
+    """
+    
+    def __init__(self, fields: Tuple[Tuple[str, str, object], ...]):
+        self.keys = tuple(field[0] for field in fields)
+        self._getter = itemgetter(*(field[1] for field in fields))
+        self._defaults = {field[1]: field[2] for field in fields}
+    
+    def values(self, record: Dict) -> tuple:
+        try:
+            return self._getter(record)
+        except KeyError:
+            return self._getter(ChainMap(record, self._defaults))
+    
+    def __call__(self, record: Dict) -> Dict:
+        return dict(zip(self.keys, self.values(record)))
+
+
+# (output key, source field, default) projections of OpenAlgo payloads
+_LIVE_PRICE = _Projection((
+    ('ltp', 'lp', 0),
+    ('change', 'change', 0),
+    ('change_percent', 'change_percent', 0),
+    ('volume', 'volume', 0),
+    ('oi', 'oi', 0),
+    ('high', 'high', 0),
+    ('low', 'low', 0),
+    ('open', 'open', 0),
+    ('close', 'close', 0)
+))
+
+_OPTION_QUOTE = _Projection((
+    ('ltp', 'lp', 0),
+    ('bid', 'bid', 0),
+    ('ask', 'ask', 0),
+    ('volume', 'volume', 0),
+    ('oi', 'oi', 0),
+    ('oi_change', 'oi_change', 0),
+    ('iv', 'iv', 20)
+))
+
+_POSITION = _Projection((
+    ('symbol', 'symbol', ''),
+    ('quantity', 'netqty', 0),
+    ('average_price', 'netavgprice', 0),
+    ('ltp', 'ltp', 0),
+    ('pnl', 'pnl', 0),
+    ('product', 'product', ''),
+    ('exchange', 'exchange', '')
+))
+
+
+def _bars_to_frame(bars: List[Dict]) -> pd.DataFrame:
+    """
+    Build a DataFrame from a list of bar dicts with explicit column dtypes
+    
+    Avoids pandas' per-row dict inference for the common OHLC payload;
+    bars carrying unexpected or uneven fields go through pd.DataFrame unchanged.
+    Missing prices become NaN; integer counts with gaps use a nullable integer
+    column, and fractional counts stay float.
+    """
+    keys = bars[0].keys()
+    time_keys = keys & {'timestamp', 'date'}
+    if not keys <= set(_PRICE_COLUMNS + _COUNT_COLUMNS) | time_keys or any(bar.keys() != keys for bar in bars):
+        return pd.DataFrame(bars)
+    
+    count = len(bars)
+    columns = {}
+    for key in sorted(time_keys):
+        columns[key] = [bar[key] for bar in bars]
+    for key in _PRICE_COLUMNS:
+        if key in keys:
+            columns[key] = np.fromiter((np.nan if bar[key] is None else bar[key] for bar in bars),
+                                       dtype=np.float64, count=count)
+    for key in _COUNT_COLUMNS:
+        if key in keys:
+            values = [bar[key] for bar in bars]
+            kinds = set(map(type, values))
+            if kinds == {int}:
+                columns[key] = np.array(values, dtype=np.int64)
+            elif kinds == {int, type(None)}:
+                # Missing counts stay missing (nullable Int64) rather than becoming 0
+                columns[key] = pd.array(values, dtype="Int64")
+            elif kinds <= {int, float, type(None)}:
+                # Fractional counts are kept as floats, not truncated
+                columns[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                return pd.DataFrame(bars)
+    return pd.DataFrame(columns)
+
+
+@lru_cache(maxsize=1)
+def _next_expiry_for(day_ordinal: int) -> str:
+    """Next weekly (Thursday) expiry after the given day, as DDMON (e.g. 05JAN)"""
+    today = date.fromordinal(day_ordinal)
+    days_ahead = 3 - today.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    
+    next_thursday = today + timedelta(days=days_ahead)
+    return next_thursday.strftime("%d%b").upper()
+
+
+def _require_auth(default: Callable[[], object]):
+    """Return a fresh `default()` instead of calling the method when OpenAlgo isn't connected"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.auth.is_connected():
+                return default()
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class OpenAlgoMarketData:
     def __init__(self, openalgo_auth: OpenAlgoAuth):
         self.auth = openalgo_auth
+        self._bulk_quotes_supported: Optional[bool] = None  # None until multiquotes succeeds or is reported missing
+        self._tick_cache: Dict[Tuple[str, str], Tuple[float, Dict]] = {}  # (symbol, exchange) -> (monotonic ts, quote)
         
+    def update_tick(self, symbol: str, quote_data: Dict, exchange: str = "NFO"):
+        """Record the latest quote for a symbol on an exchange (e.g. from a streaming feed)"""
+        self._tick_cache[(symbol, exchange)] = (time.monotonic(), quote_data)
+    
+    @_require_auth(lambda: {"error": "Not connected to OpenAlgo"})
     def get_live_price(self, symbol: str, exchange: str = "NFO") -> Dict:
-        if not self.auth.is_connected():
-            return {"error": "Not connected to OpenAlgo"}
-        
-        result = self.auth.get_quotes(symbol, exchange)
-        
-        if result['success']:
-            quote_data = result['data']
-            return {
-                'ltp': quote_data.get('lp', 0),
-                'change': quote_data.get('change', 0),
-                'change_percent': quote_data.get('change_percent', 0),
-                'volume': quote_data.get('volume', 0),
-                'oi': quote_data.get('oi', 0),
-                'high': quote_data.get('high', 0),
-                'low': quote_data.get('low', 0),
-                'open': quote_data.get('open', 0),
-                'close': quote_data.get('close', 0)
-            }
+        tick = self._tick_cache.get((symbol, exchange))
+        if tick and time.monotonic() - tick[0] < TICK_MAX_AGE:
+            quote_data = tick[1]
         else:
-            return {"error": result.get('message', 'Failed to fetch price')}
+            result = self.auth.get_quotes(symbol, exchange)
+            if not result['success']:
+                return {"error": result.get('message', 'Failed to fetch price')}
+            quote_data = result['data']
+            self.update_tick(symbol, quote_data, exchange)
+        
+        return _LIVE_PRICE(quote_data)
     
+    @_require_auth(pd.DataFrame)
     def get_option_chain_live(self, symbol: str, expiry: str = None) -> pd.DataFrame:
-        if not self.auth.is_connected():
-            return pd.DataFrame()
-        
-        option_data = []
-        
         if symbol == "NIFTY":
             base_symbol = "NIFTY"
             base_price = 19500
@@ -54,111 +198,90 @@ class OpenAlgoMarketData:
         if not expiry:
             expiry = self._get_next_expiry()
         
-        for i in range(-5, 6):
-            strike = base_price + (i * step)
-            
-            ce_symbol = f"{base_symbol}{expiry}{strike}CE"
-            pe_symbol = f"{base_symbol}{expiry}{strike}PE"
-            
-            ce_quote = self.auth.get_quotes(ce_symbol, "NFO")
-            pe_quote = self.auth.get_quotes(pe_symbol, "NFO")
-            
-            if ce_quote['success']:
-                ce_data = ce_quote['data']
-                option_data.append({
-                    'strike': strike,
-                    'type': 'CE',
-                    'ltp': ce_data.get('lp', 0),
-                    'bid': ce_data.get('bid', 0),
-                    'ask': ce_data.get('ask', 0),
-                    'volume': ce_data.get('volume', 0),
-                    'oi': ce_data.get('oi', 0),
-                    'oi_change': ce_data.get('oi_change', 0),
-                    'iv': ce_data.get('iv', 20),
-                    'delta': 0.5,
-                    'gamma': 0.005,
-                    'theta': -5,
-                    'vega': 20
-                })
-            
-            if pe_quote['success']:
-                pe_data = pe_quote['data']
-                option_data.append({
-                    'strike': strike,
-                    'type': 'PE',
-                    'ltp': pe_data.get('lp', 0),
-                    'bid': pe_data.get('bid', 0),
-                    'ask': pe_data.get('ask', 0),
-                    'volume': pe_data.get('volume', 0),
-                    'oi': pe_data.get('oi', 0),
-                    'oi_change': pe_data.get('oi_change', 0),
-                    'iv': pe_data.get('iv', 20),
-                    'delta': -0.5,
-                    'gamma': 0.005,
-                    'theta': -5,
-                    'vega': 20
-                })
-        
-        return pd.DataFrame(option_data) if option_data else pd.DataFrame()
+        # Interleaved CE/PE rows per strike: [K0 CE, K0 PE, K1 CE, K1 PE, ...]
+        strikes = np.repeat(base_price + np.arange(-5, 6) * step, 2)
+        types = np.tile(np.array(['CE', 'PE']), len(strikes) // 2)
+        symbols = [f"{base_symbol}{expiry}{strike}{option_type}"
+                   for strike, option_type in zip(strikes.tolist(), types.tolist())]
+        
+        quotes = self._fetch_option_quotes(symbols)
+        for option_symbol, quote in zip(symbols, quotes):
+            if quote['success']:
+                self.update_tick(option_symbol, quote['data'], "NFO")
+        ok = np.fromiter((quote['success'] for quote in quotes), dtype=bool, count=len(quotes))
+        if not ok.any():
+            return pd.DataFrame()
+        
+        rows = [_OPTION_QUOTE.values(quote['data']) for quote in quotes if quote['success']]
+        columns = {'strike': strikes[ok], 'type': types[ok]}
+        columns.update(zip(_OPTION_QUOTE.keys, map(list, zip(*rows))))
+        
+        df = pd.DataFrame(columns)
+        # Placeholder Greeks until they are computed from live IV
+        df['delta'] = np.where(df['type'] == 'CE', 0.5, -0.5)
+        df['gamma'] = 0.005
+        df['theta'] = -5
+        df['vega'] = 20
+        return df
     
-    def _get_next_expiry(self) -> str:
-        today = datetime.now()
-        days_ahead = 3 - today.weekday()
-        if days_ahead <= 0:
-            days_ahead += 7
+    def _fetch_option_quotes(self, symbols: List[str]) -> List[Dict]:
+        """
+        Fetch NFO quotes for all symbols, preserving order
         
-        next_thursday = today + timedelta(days=days_ahead)
-        return next_thursday.strftime("%d%b").upper()
+        Uses a single multiquotes request when the server supports it,
+        otherwise fans the single-symbol requests out concurrently. Bulk
+        quotes are only given up on when the endpoint is reported missing;
+        other failures fall back for this call alone.
+        """
+        if self._bulk_quotes_supported is not False:
+            result = self.auth.get_multi_quotes([{'symbol': s, 'exchange': 'NFO'} for s in symbols])
+            if result['success']:
+                self._bulk_quotes_supported = True
+                by_symbol = result['data']
+                return [
+                    {'success': True, 'data': by_symbol[s]} if s in by_symbol
+                    else {'success': False, 'message': 'Symbol missing from multiquotes'}
+                    for s in symbols
+                ]
+            if result.get('status_code') in _UNSUPPORTED_STATUSES:
+                self._bulk_quotes_supported = False
+        
+        # Quotes are network-bound, so fetch them concurrently over the pooled session
+        with ThreadPoolExecutor(max_workers=QUOTE_FETCH_WORKERS) as executor:
+            return list(executor.map(lambda s: self.auth.get_quotes(s, "NFO"), symbols))
+    
+    def _get_next_expiry(self) -> str:
+        return _next_expiry_for(date.today().toordinal())
     
+    @_require_auth(dict)
     def get_market_depth(self, symbol: str, exchange: str = "NFO") -> Dict:
-        if not self.auth.is_connected():
-            return {}
-        
         result = self.auth.get_depth(symbol, exchange)
         
         if result['success']:
             depth_data = result['data']
+            bids = depth_data.get('bids', [])
+            asks = depth_data.get('asks', [])
             return {
-                'bids': depth_data.get('bids', []),
-                'asks': depth_data.get('asks', []),
-                'total_bid_qty': sum(bid.get('quantity', 0) for bid in depth_data.get('bids', [])),
-                'total_ask_qty': sum(ask.get('quantity', 0) for ask in depth_data.get('asks', []))
+                'bids': bids,
+                'asks': asks,
+                'total_bid_qty': sum(bid.get('quantity', 0) for bid in bids),
+                'total_ask_qty': sum(ask.get('quantity', 0) for ask in asks)
             }
         else:
             return {}
     
+    @_require_auth(list)
     def get_positions_from_broker(self) -> List[Dict]:
-        if not self.auth.is_connected():
-            return []
-        
         result = self.auth.get_positions()
         
         if result['success']:
             positions_data = result['data']
-            positions = []
-            
-            for pos in positions_data.get('positions', []):
-                positions.append({
-                    'symbol': pos.get('symbol', ''),
-                    'quantity': pos.get('netqty', 0),
-                    'average_price': pos.get('netavgprice', 0),
-                    'ltp': pos.get('ltp', 0),
-                    'pnl': pos.get('pnl', 0),
-                    'product': pos.get('product', ''),
-                    'exchange': pos.get('exchange', '')
-                })
-            
-            return positions
+            return [_POSITION(pos) for pos in positions_data.get('positions', [])]
         else:
             return []
     
+    @_require_auth(lambda: {'success': False, 'message': 'Not connected to OpenAlgo'})
     def place_option_order(self, order_params: Dict) -> Dict:
-        if not self.auth.is_connected():
-            return {
-                'success': False,
-                'message': 'Not connected to OpenAlgo'
-            }
-        
         openalgo_order = {
             'apikey': self.auth.api_key,
             'strategy': order_params.get('strategy', 'AI_TRADER'),
@@ -178,6 +301,7 @@ class OpenAlgoMarketData:
         
         return result
     
+    @_require_auth(pd.DataFrame)
     def get_historical_ohlc(self, symbol: str, exchange: str = "NSE", 
                             interval: str = "1d", days: int = 30) -> pd.DataFrame:
         """
@@ -192,13 +316,9 @@ class OpenAlgoMarketData:
         Returns:
             DataFrame with OHLC, volume, OI data
         """
-        if not self.auth.is_connected():
-            return pd.DataFrame()
-        
-        from datetime import datetime, timedelta
-        
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        now = datetime.now()
+        end_date = now.strftime('%Y-%m-%d')
+        start_date = (now - timedelta(days=days)).strftime('%Y-%m-%d')
         
         result = self.auth.get_historical_data(symbol, exchange, interval, start_date, end_date)
         
@@ -206,26 +326,21 @@ class OpenAlgoMarketData:
             data = result['data']
             
             if isinstance(data, list) and len(data) > 0:
-                df = pd.DataFrame(data)
+                df = _bars_to_frame(data)
                 
                 if 'timestamp' in df.columns or 'date' in df.columns:
                     time_col = 'timestamp' if 'timestamp' in df.columns else 'date'
-                    df[time_col] = pd.to_datetime(df[time_col])
-                    df = df.sort_values(time_col)
+                    df[time_col] = pd.to_datetime(df[time_col], cache=True)
+                    # Brokers almost always return bars in order; only sort when needed
+                    if not df[time_col].is_monotonic_increasing:
+                        df = df.sort_values(time_col, kind='stable', ignore_index=True)
                 
                 return df
         
         return pd.DataFrame()
     
-    def get_supported_brokers(self) -> List[str]:
+    def get_supported_brokers(self) -> Tuple[str, ...]:
         """
         Get list of all supported brokers via OpenAlgo
         """
-        return [
-            "Zerodha", "AngelOne", "Upstox", "Fyers", "Dhan", 
-            "Flattrade", "Shoonya", "AliceBlue", "5Paisa", "IIFL", 
-            "Kotak Securities", "Paytm", "Groww", "Firstock", 
-            "Motilal Oswal", "Tradejini", "IndMoney", "Zebu", 
-            "Wisdom", "Pocketful", "Definedge", "Compositedge", 
-            "Ibulls", "Fivepaisaxts", "Dhan Sandbox"
-        ]
+        return SUPPORTED_BROKERS
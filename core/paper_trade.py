@@ -5,14 +5,127 @@ from typing import Dict, List, Optional
 import uuid
 import json
 import os
+from collections import deque
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+
+try:
+    import orjson  # Optional: faster encode/decode for portfolio persistence
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit  # Optional: compiles the mark-to-market kernel
+except ImportError:
+    njit = None
+
+TRADE_HISTORY_FILE = 'data/trade_history.jsonl'
+TRADE_HISTORY_LIMIT = 1000
+CLOSED_POSITIONS_FILE = 'data/closed_positions.jsonl'
+AUTO_TRADE_STRIKES_WINDOW = 5  # strikes either side of ATM considered by auto trading
+
+# Random bytes for position/trade ids are drawn in batches, one urandom call per batch
+_ID_BATCH_SIZE = 256
+_id_pool = deque()
+
+def _new_id() -> str:
+    """Return a random (version 4) UUID string"""
+    if not _id_pool:
+        raw = os.urandom(16 * _ID_BATCH_SIZE)
+        _id_pool.extend(
+            str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, len(raw), 16)
+        )
+    return _id_pool.popleft()
+
+def _mark_to_market(entry, current, units, stop_loss, take_profit):
+    """Unrealized P&L and stop-loss / take-profit hit masks for the open book"""
+    unrealized = (current - entry) * units
+    # Stop loss takes precedence over take profit, as in a per-position check
+    sl_hit = current <= stop_loss
+    tp_hit = ~sl_hit & (current >= take_profit)
+    return unrealized, sl_hit, tp_hit
+
+if njit is not None:
+    _mark_to_market = njit(cache=True)(_mark_to_market)
+
+def _to_json(obj) -> str:
+    """Encode portfolio data as a JSON string"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, default=str)
+
+def _write_json_atomic(path: str, obj):
+    """Write JSON to a temp file and rename it over path so readers never see a partial file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(_to_json(obj))
+    os.replace(tmp_path, path)
+
+def _from_json(text):
+    """Decode a JSON document or JSONL line"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _append_jsonl(path: str, records: List[Dict]):
+    """Append records to a JSONL file, one object per line"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        f.writelines(_to_json(r) + "\n" for r in records)
+
+@dataclass(slots=True)
+class Position:
+    """A paper-traded option position (slotted record instead of a per-position dict)"""
+    id: str
+    signal_id: Optional[str]
+    symbol: str
+    strike: float
+    type: str
+    action: str
+    quantity: int
+    lot_size: int
+    entry_price: float
+    current_price: float
+    entry_time: str
+    trade_type: str
+    status: str
+    confidence: float
+    reasoning: str
+    unrealized_pnl: float
+    stop_loss: float
+    take_profit: float
+    parameters: Dict = field(default_factory=dict)
+    exit_price: Optional[float] = None
+    exit_time: Optional[str] = None
+    realized_pnl: Optional[float] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Position':
+        """Build a position from its JSON form, ignoring keys it does not define"""
+        return cls(**{name: data[name] for name in _POSITION_FIELDS if name in data})
+    
+    def to_dict(self) -> Dict:
+        """JSON form of the position; exit fields appear once it is closed"""
+        data = {name: getattr(self, name) for name in _POSITION_FIELDS}
+        if self.status == 'open':
+            for name in _EXIT_FIELDS:
+                del data[name]
+        return data
+
+_POSITION_FIELDS = tuple(f.name for f in fields(Position))
+_EXIT_FIELDS = ('exit_price', 'exit_time', 'realized_pnl')
 
 class PaperTradingEngine:
     def __init__(self):
         self.portfolio_value = 100000  # Starting with ₹1 lakh
         self.available_balance = 100000
-        self.positions = []
-        self.trade_history = []
+        self._open = {}  # id -> open Position, in opening order
+        self._closed = []  # closed Positions, in closing order
+        self.trade_history = deque(maxlen=TRADE_HISTORY_LIMIT)  # Oldest trades drop off automatically
         self.daily_pnl = 0
+        self.daily_pnl_date = datetime.now().date().isoformat()
         self.total_pnl = 0
         
         # Auto trading settings
@@ -20,53 +133,190 @@ class PaperTradingEngine:
         self.max_daily_trades = 5
         self.trades_today = 0
         
+        # Append-only handle for the trade log, opened lazily
+        self._hist_fh = None
+        
+        # Column arrays over open positions, rebuilt when the open set changes
+        self._book = None
+        
+        # (symbol, strike, type) -> open positions in FIFO order
+        self._open_by_key = {}
+        
+        # Running market value of open positions, adjusted by deltas
+        self._open_mv = 0.0
+        
+        # Snapshot files changed since the last save ('portfolio', 'positions')
+        self._dirty = set()
+        
+        # Nesting depth of _batch_saves(); saves inside a batch run once at the end
+        self._save_depth = 0
+        self._save_pending = False
+        
+        # Closed-trade statistics, updated as positions close
+        self._perf = self._empty_perf()
+        
         # Load existing data
         self.load_portfolio_data()
         
     def load_portfolio_data(self):
         """Load existing portfolio data if available"""
         try:
+            seed_daily_pnl = True
             if os.path.exists('data/portfolio.json'):
                 with open('data/portfolio.json', 'r') as f:
-                    data = json.load(f)
+                    data = _from_json(f.read())
                     self.portfolio_value = data.get('portfolio_value', 100000)
                     self.available_balance = data.get('available_balance', 100000)
                     self.total_pnl = data.get('total_pnl', 0)
                     
+                    # Daily P&L survives a restart only on the same day
+                    seed_daily_pnl = 'daily_pnl_date' not in data
+                    if data.get('daily_pnl_date') == self.daily_pnl_date:
+                        self.daily_pnl = data.get('daily_pnl', 0)
+                    
+            # positions.json holds the open book; closed positions are an append-only log
+            stored_positions = []
             if os.path.exists('data/positions.json'):
                 with open('data/positions.json', 'r') as f:
-                    self.positions = json.load(f)
-                    
-            if os.path.exists('data/trade_history.json'):
+                    stored_positions = _from_json(f.read())
+            
+            closed_positions = []
+            if os.path.exists(CLOSED_POSITIONS_FILE):
+                with open(CLOSED_POSITIONS_FILE, 'r') as f:
+                    closed_positions = [_from_json(line) for line in f if line.strip()]
+            closed_ids = {p['id'] for p in closed_positions}
+            
+            # Closed entries still in positions.json come from the legacy format
+            # (or a crash between the log append and the snapshot rewrite)
+            legacy_closed = [
+                p for p in stored_positions
+                if p['status'] == 'closed' and p['id'] not in closed_ids
+            ]
+            if legacy_closed:
+                _append_jsonl(CLOSED_POSITIONS_FILE, legacy_closed)
+                closed_positions.extend(legacy_closed)
+                closed_ids.update(p['id'] for p in legacy_closed)
+                self._dirty.add('positions')
+            
+            self._closed = [Position.from_dict(p) for p in closed_positions]
+            self._open = {
+                p['id']: Position.from_dict(p) for p in stored_positions
+                if p['status'] == 'open' and p['id'] not in closed_ids
+            }
+            self._book = None
+            self._index_open_positions()
+            
+            self._perf = self._empty_perf()
+            for p in closed_positions:
+                self._record_closed_pnl(p['realized_pnl'])
+            
+            if os.path.exists(TRADE_HISTORY_FILE):
+                with open(TRADE_HISTORY_FILE, 'r') as f:
+                    recent_lines = deque(f, maxlen=TRADE_HISTORY_LIMIT)
+                self.trade_history = deque(
+                    (_from_json(line) for line in recent_lines if line.strip()), maxlen=TRADE_HISTORY_LIMIT
+                )
+            elif os.path.exists('data/trade_history.json'):
+                # Legacy snapshot format: migrate once into the JSONL log
                 with open('data/trade_history.json', 'r') as f:
-                    self.trade_history = json.load(f)
+                    self.trade_history = deque(_from_json(f.read()), maxlen=TRADE_HISTORY_LIMIT)
+                with open(TRADE_HISTORY_FILE, 'w') as f:
+                    f.writelines(_to_json(t) + "\n" for t in self.trade_history)
+            
+            # Older portfolio files lack a stored daily P&L; derive it from history once.
+            # ISO timestamps start with the date, so a prefix test replaces parsing.
+            if seed_daily_pnl:
+                today = self.daily_pnl_date
+                self.daily_pnl = sum(
+                    t['pnl'] for t in self.trade_history
+                    if t['action'] == 'CLOSE' and t['timestamp'].startswith(today)
+                )
         except Exception as e:
             print(f"Error loading portfolio data: {e}")
     
+    @property
+    def positions(self) -> List[Dict]:
+        """All positions, closed then open, as dict copies (the stored records stay internal)"""
+        return [p.to_dict() for p in chain(self._closed, self._open.values())]
+    
+    def _index_open_positions(self):
+        """Rebuild the (symbol, strike, type) lookup over open positions"""
+        self._open_by_key = {}
+        self._open_mv = 0.0
+        for p in self._open.values():
+            self._open_by_key.setdefault((p.symbol, p.strike, p.type), deque()).append(p)
+            self._open_mv += p.current_price * p.quantity * p.lot_size
+    
+    @staticmethod
+    def _empty_perf() -> Dict:
+        """Zeroed closed-trade statistics"""
+        return {'closed': 0, 'wins': 0, 'losses': 0, 'sum_wins': 0.0, 'sum_losses': 0.0,
+                'max_win': 0, 'max_loss': 0}
+    
+    def _record_closed_pnl(self, pnl: float):
+        """Fold one realized P&L into the running performance counters"""
+        perf = self._perf
+        perf['closed'] += 1
+        if pnl > 0:
+            perf['wins'] += 1
+            perf['sum_wins'] += pnl
+            if pnl > perf['max_win']:
+                perf['max_win'] = pnl
+        elif pnl < 0:
+            perf['losses'] += 1
+            perf['sum_losses'] += pnl
+            if pnl < perf['max_loss']:
+                perf['max_loss'] = pnl
+    
+    @contextmanager
+    def _batch_saves(self):
+        """Defer save_portfolio_data calls until the outermost batch exits"""
+        self._save_depth += 1
+        try:
+            yield
+        finally:
+            self._save_depth -= 1
+            if not self._save_depth and self._save_pending:
+                self.save_portfolio_data()
+    
     def save_portfolio_data(self):
         """Save portfolio data to files"""
+        if self._save_depth:
+            self._save_pending = True
+            return
+        self._save_pending = False
+        
+        self.save_portfolio_summary()
+        
+        # Trade history is appended per trade; just make it visible to readers
+        if self._hist_fh is not None:
+            try:
+                self._hist_fh.flush()
+            except Exception as e:
+                print(f"Error flushing trade history: {e}")
+    
+    def save_portfolio_summary(self):
+        """Save balances and positions (trade history lives in the JSONL log)"""
         try:
             os.makedirs('data', exist_ok=True)
             
             # Save portfolio summary
-            portfolio_data = {
-                'portfolio_value': self.portfolio_value,
-                'available_balance': self.available_balance,
-                'total_pnl': self.total_pnl,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open('data/portfolio.json', 'w') as f:
-                json.dump(portfolio_data, f, default=str)
-            
-            # Save positions
-            with open('data/positions.json', 'w') as f:
-                json.dump(self.positions, f, default=str)
+            if 'portfolio' in self._dirty:
+                portfolio_data = {
+                    'portfolio_value': self.portfolio_value,
+                    'available_balance': self.available_balance,
+                    'total_pnl': self.total_pnl,
+                    'daily_pnl': self.daily_pnl,
+                    'daily_pnl_date': self.daily_pnl_date,
+                    'last_updated': datetime.now().isoformat()
+                }
+                _write_json_atomic('data/portfolio.json', portfolio_data)
+                self._dirty.discard('portfolio')
             
-            # Save trade history (keep last 1000 trades)
-            recent_history = self.trade_history[-1000:] if len(self.trade_history) > 1000 else self.trade_history
-            with open('data/trade_history.json', 'w') as f:
-                json.dump(recent_history, f, default=str)
+            # Save open positions (closed ones are already in the closed-positions log)
+            if 'positions' in self._dirty:
+                _write_json_atomic('data/positions.json', [p.to_dict() for p in self._open.values()])
+                self._dirty.discard('positions')
                 
         except Exception as e:
             print(f"Error saving portfolio data: {e}")
@@ -83,17 +333,19 @@ class PaperTradingEngine:
         Dictionary with execution result
         """
         try:
+            # One clock read per trade; every timestamp it produces shares it
+            now = datetime.now()
             if signal['action'] == 'BUY':
-                return self.open_position(signal, trade_type)
+                return self.open_position(signal, trade_type, now)
             elif signal['action'] == 'SELL':
-                return self.close_position(signal, trade_type)
+                return self.close_position(signal, trade_type, now)
             else:
                 return {'success': False, 'message': 'Invalid action'}
                 
         except Exception as e:
             return {'success': False, 'message': f'Trade execution error: {str(e)}'}
     
-    def open_position(self, signal: Dict, trade_type: str) -> Dict:
+    def open_position(self, signal: Dict, trade_type: str, now: Optional[datetime] = None) -> Dict:
         """Open a new position"""
         # Check if we can afford this trade
         entry_price = signal.get('price', 0)
@@ -116,34 +368,38 @@ class PaperTradingEngine:
             }
         
         # Create position
-        position = {
-            'id': str(uuid.uuid4()),
-            'signal_id': signal.get('id'),
-            'symbol': signal['symbol'],
-            'strike': signal['strike'],
-            'type': signal['type'],
-            'action': signal['action'],
-            'quantity': quantity,
-            'lot_size': lot_size,
-            'entry_price': entry_price,
-            'current_price': entry_price,
-            'entry_time': datetime.now().isoformat(),
-            'trade_type': trade_type,
-            'status': 'open',
-            'confidence': signal['confidence'],
-            'reasoning': signal['reasoning'],
-            'unrealized_pnl': 0,
-            'stop_loss': entry_price * 0.9,  # 10% stop loss
-            'take_profit': entry_price * 1.2,  # 20% take profit
-            'parameters': signal.get('parameters', {})
-        }
+        position = Position(
+            id=_new_id(),
+            signal_id=signal.get('id'),
+            symbol=signal['symbol'],
+            strike=signal['strike'],
+            type=signal['type'],
+            action=signal['action'],
+            quantity=quantity,
+            lot_size=lot_size,
+            entry_price=entry_price,
+            current_price=entry_price,
+            entry_time=(now or datetime.now()).isoformat(),
+            trade_type=trade_type,
+            status='open',
+            confidence=signal['confidence'],
+            reasoning=signal['reasoning'],
+            unrealized_pnl=0,
+            stop_loss=entry_price * 0.9,  # 10% stop loss
+            take_profit=entry_price * 1.2,  # 20% take profit
+            parameters=signal.get('parameters', {})
+        )
         
         # Update balances
         self.available_balance -= total_cost
-        self.positions.append(position)
+        self._open_mv += total_cost
+        self._open[position.id] = position
+        self._dirty.update(('portfolio', 'positions'))
+        self._open_by_key.setdefault((position.symbol, position.strike, position.type), deque()).append(position)
+        self._book = None
         
         # Record trade
-        self.record_trade(position, 'OPEN')
+        self.record_trade(position, 'OPEN', position.entry_time)
         
         # Update counters
         if trade_type == 'paper':
@@ -155,24 +411,19 @@ class PaperTradingEngine:
         return {
             'success': True,
             'message': f'Position opened successfully. Cost: ₹{total_cost:.2f}',
-            'position_id': position['id'],
-            'position': position
+            'position_id': position.id,
+            'position': position.to_dict()
         }
     
-    def close_position(self, signal: Dict, trade_type: str = None) -> Dict:
+    def close_position(self, signal: Dict, trade_type: str = None, now: Optional[datetime] = None) -> Dict:
         """Close an existing position"""
         # Find matching open position
         symbol = signal['symbol']
         strike = signal['strike']
         option_type = signal['type']
         
-        matching_positions = [
-            p for p in self.positions 
-            if (p['symbol'] == symbol and 
-                p['strike'] == strike and 
-                p['type'] == option_type and 
-                p['status'] == 'open')
-        ]
+        key = (symbol, strike, option_type)
+        matching_positions = self._open_by_key.get(key)
         
         if not matching_positions:
             return {
@@ -181,34 +432,45 @@ class PaperTradingEngine:
             }
         
         # Close the first matching position (FIFO)
-        position = matching_positions[0]
-        exit_price = signal.get('price', position['current_price'])
-        exit_time = datetime.now()
+        position = matching_positions.popleft()
+        if not matching_positions:
+            del self._open_by_key[key]
+        exit_price = signal.get('price', position.current_price)
+        exit_time = now or datetime.now()
         
         # Calculate P&L
-        entry_cost = position['entry_price'] * position['quantity'] * position['lot_size']
-        exit_value = exit_price * position['quantity'] * position['lot_size']
+        entry_cost = position.entry_price * position.quantity * position.lot_size
+        exit_value = exit_price * position.quantity * position.lot_size
         pnl = exit_value - entry_cost
         
         # Update position
-        position['exit_price'] = exit_price
-        position['exit_time'] = exit_time.isoformat()
-        position['realized_pnl'] = pnl
-        position['status'] = 'closed'
+        position.exit_price = exit_price
+        position.exit_time = exit_time.isoformat()
+        position.realized_pnl = pnl
+        position.status = 'closed'
+        del self._open[position.id]
+        self._closed.append(position)
+        self._book = None
+        self._dirty.update(('portfolio', 'positions'))
+        
+        try:
+            _append_jsonl(CLOSED_POSITIONS_FILE, [position.to_dict()])
+        except Exception as e:
+            print(f"Error writing closed position: {e}")
         
         # Update balances
         self.available_balance += exit_value
+        self._open_mv -= position.current_price * position.quantity * position.lot_size
+        self._roll_daily_pnl(exit_time)
         self.daily_pnl += pnl
         self.total_pnl += pnl
+        self._record_closed_pnl(pnl)
         
         # Calculate new portfolio value
-        self.portfolio_value = self.available_balance + sum(
-            p['current_price'] * p['quantity'] * p['lot_size'] 
-            for p in self.positions if p['status'] == 'open'
-        )
+        self.portfolio_value = self.available_balance + self._open_mv
         
         # Record trade
-        self.record_trade(position, 'CLOSE')
+        self.record_trade(position, 'CLOSE', position.exit_time)
         
         # Save data
         self.save_portfolio_data()
@@ -217,63 +479,85 @@ class PaperTradingEngine:
             'success': True,
             'message': f'Position closed. P&L: ₹{pnl:.2f}',
             'pnl': pnl,
-            'position': position
+            'position': position.to_dict()
         }
     
+    def _open_book(self) -> Dict:
+        """Structure-of-arrays view of open positions for vectorized marking"""
+        if self._book is None:
+            open_positions = list(self._open.values())
+            self._book = {
+                'positions': open_positions,
+                'keys': [f"{p.symbol}_{p.type}_{p.strike}" for p in open_positions],
+                'entry': np.array([p.entry_price for p in open_positions], dtype=float),
+                'current': np.array([p.current_price for p in open_positions], dtype=float),
+                'units': np.array([p.quantity * p.lot_size for p in open_positions], dtype=float),
+                'stop_loss': np.array([p.stop_loss for p in open_positions], dtype=float),
+                'take_profit': np.array([p.take_profit for p in open_positions], dtype=float)
+            }
+        return self._book
+    
     def update_position_prices(self, price_updates: Dict):
         """Update current prices for all open positions"""
-        for position in self.positions:
-            if position['status'] == 'open':
-                key = f"{position['symbol']}_{position['type']}_{position['strike']}"
-                
-                if key in price_updates:
-                    old_price = position['current_price']
-                    new_price = price_updates[key]
-                    position['current_price'] = new_price
-                    
-                    # Calculate unrealized P&L
-                    entry_cost = position['entry_price'] * position['quantity'] * position['lot_size']
-                    current_value = new_price * position['quantity'] * position['lot_size']
-                    position['unrealized_pnl'] = current_value - entry_cost
+        book = self._open_book()
+        keys = book['keys']
+        current = book['current']
+        
+        if keys:
+            new_prices = np.fromiter(
+                (price_updates.get(key, np.nan) for key in keys), dtype=float, count=len(keys)
+            )
+            updated = ~np.isnan(new_prices)
+            moved = new_prices[updated]
+            self._open_mv += float((moved - current[updated]) @ book['units'][updated])
+            current[updated] = moved
+        
+        unrealized, sl_hit, tp_hit = self._mark_book(book)
+        
+        if keys:
+            positions = book['positions']
+            for i in np.flatnonzero(updated):
+                positions[i].current_price = price_updates[keys[i]]
+                positions[i].unrealized_pnl = float(unrealized[i])
+            if updated.any():
+                self._dirty.update(('portfolio', 'positions'))
         
         # Update portfolio value
-        open_positions_value = sum(
-            p['current_price'] * p['quantity'] * p['lot_size'] 
-            for p in self.positions if p['status'] == 'open'
-        )
-        
-        self.portfolio_value = self.available_balance + open_positions_value
+        self.portfolio_value = self.available_balance + self._open_mv
         
         # Check for stop loss / take profit
-        self.check_auto_exits()
+        self._execute_auto_exits(book, sl_hit, tp_hit)
+    
+    @staticmethod
+    def _mark_book(book: Dict):
+        """Run the mark-to-market kernel over the open book"""
+        return _mark_to_market(
+            book['entry'], book['current'], book['units'], book['stop_loss'], book['take_profit']
+        )
     
     def check_auto_exits(self):
         """Check and execute automatic exits for stop loss / take profit"""
+        book = self._open_book()
+        _, sl_hit, tp_hit = self._mark_book(book)
+        self._execute_auto_exits(book, sl_hit, tp_hit)
+    
+    def _execute_auto_exits(self, book: Dict, sl_hit: np.ndarray, tp_hit: np.ndarray):
+        """Close the open-book positions flagged by the stop-loss / take-profit masks"""
+        positions = book['positions']
         positions_to_close = []
-        
-        for position in self.positions:
-            if position['status'] == 'open':
-                current_price = position['current_price']
-                
-                # Check stop loss
-                if current_price <= position['stop_loss']:
-                    positions_to_close.append({
-                        'position': position,
-                        'reason': 'stop_loss',
-                        'exit_price': position['stop_loss']
-                    })
-                
-                # Check take profit
-                elif current_price >= position['take_profit']:
-                    positions_to_close.append({
-                        'position': position,
-                        'reason': 'take_profit',
-                        'exit_price': position['take_profit']
-                    })
-        
-        # Execute auto exits
-        for exit_info in positions_to_close:
-            self.auto_close_position(exit_info)
+        for i in np.flatnonzero(sl_hit | tp_hit):
+            position = positions[i]
+            reason = 'stop_loss' if sl_hit[i] else 'take_profit'
+            positions_to_close.append({
+                'position': position,
+                'reason': reason,
+                'exit_price': getattr(position, reason)
+            })
+        
+        # Execute auto exits, persisting once for the whole batch
+        with self._batch_saves():
+            for exit_info in positions_to_close:
+                self.auto_close_position(exit_info)
     
     def auto_close_position(self, exit_info: Dict):
         """Automatically close a position"""
@@ -283,72 +567,82 @@ class PaperTradingEngine:
         
         # Create a mock signal for closing
         close_signal = {
-            'symbol': position['symbol'],
-            'strike': position['strike'],
-            'type': position['type'],
+            'symbol': position.symbol,
+            'strike': position.strike,
+            'type': position.type,
             'price': exit_price,
             'action': 'SELL',
             'reason': f'Auto exit: {reason}'
         }
         
-        result = self.close_position(close_signal, position['trade_type'])
+        result = self.close_position(close_signal, position.trade_type)
         
         if result['success']:
-            print(f"Auto exit executed: {reason} for {position['symbol']} {position['type']} {position['strike']}")
+            print(f"Auto exit executed: {reason} for {position.symbol} {position.type} {position.strike}")
     
-    def record_trade(self, position: Dict, action: str):
+    def record_trade(self, position: Position, action: str, timestamp: Optional[str] = None):
         """Record trade in history"""
         trade_record = {
-            'id': str(uuid.uuid4()),
-            'position_id': position['id'],
-            'symbol': position['symbol'],
-            'strike': position['strike'],
-            'type': position['type'],
+            'id': _new_id(),
+            'position_id': position.id,
+            'symbol': position.symbol,
+            'strike': position.strike,
+            'type': position.type,
             'action': action,
-            'quantity': position['quantity'],
-            'price': position['entry_price'] if action == 'OPEN' else position.get('exit_price'),
-            'timestamp': datetime.now().isoformat(),
-            'trade_type': position['trade_type'],
-            'confidence': position.get('confidence', 0),
-            'reasoning': position.get('reasoning', ''),
-            'pnl': position.get('realized_pnl', 0) if action == 'CLOSE' else 0
+            'quantity': position.quantity,
+            'price': position.entry_price if action == 'OPEN' else position.exit_price,
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'trade_type': position.trade_type,
+            'confidence': position.confidence,
+            'reasoning': position.reasoning,
+            'pnl': position.realized_pnl if action == 'CLOSE' else 0
         }
         
         self.trade_history.append(trade_record)
+        
+        self.append_trade_log(trade_record)
+    
+    def append_trade_log(self, trade_record: Dict):
+        """Append a single trade record to the JSONL trade log"""
+        try:
+            if self._hist_fh is None:
+                os.makedirs('data', exist_ok=True)
+                self._hist_fh = open(TRADE_HISTORY_FILE, 'a')
+            self._hist_fh.write(_to_json(trade_record) + "\n")
+        except Exception as e:
+            print(f"Error writing trade history: {e}")
     
     def get_portfolio_value(self) -> float:
         """Get current portfolio value"""
         return self.portfolio_value
     
+    def _roll_daily_pnl(self, now: Optional[datetime] = None):
+        """Start a fresh daily P&L when the calendar day changes"""
+        today = (now or datetime.now()).date().isoformat()
+        if today != self.daily_pnl_date:
+            self.daily_pnl = 0
+            self.daily_pnl_date = today
+            self._dirty.add('portfolio')
+    
     def get_daily_pnl(self) -> float:
         """Get today's P&L"""
-        # Calculate P&L for trades closed today
-        today = datetime.now().date()
-        today_trades = [
-            t for t in self.trade_history 
-            if (datetime.fromisoformat(t['timestamp']).date() == today and 
-                t['action'] == 'CLOSE')
-        ]
-        
-        return sum(t['pnl'] for t in today_trades)
+        self._roll_daily_pnl()
+        return self.daily_pnl
     
     def get_current_positions(self) -> List[Dict]:
         """Get all open positions with current P&L"""
-        open_positions = [p for p in self.positions if p['status'] == 'open']
+        book = self._open_book()
+        pnl = (book['current'] - book['entry']) * book['units']
         
-        # Add current P&L calculation
-        for position in open_positions:
-            entry_cost = position['entry_price'] * position['quantity'] * position['lot_size']
-            current_value = position['current_price'] * position['quantity'] * position['lot_size']
-            position['pnl'] = current_value - entry_cost
-        
-        return open_positions
+        # Copies, so dashboard polls never mutate the stored position records
+        return [{**p.to_dict(), 'pnl': float(v)} for p, v in zip(book['positions'], pnl)]
     
     def get_performance_summary(self) -> Dict:
         """Get performance summary"""
-        closed_positions = [p for p in self.positions if p['status'] == 'closed']
+        perf = self._perf
+        closed = perf['closed']
         
-        if not closed_positions:
+        if not closed:
             return {
                 'total_trades': 0,
                 'winning_trades': 0,
@@ -362,25 +656,39 @@ class PaperTradingEngine:
                 'max_loss': 0
             }
         
-        winning_trades = [p for p in closed_positions if p['realized_pnl'] > 0]
-        losing_trades = [p for p in closed_positions if p['realized_pnl'] < 0]
-        
-        total_wins = sum(p['realized_pnl'] for p in winning_trades)
-        total_losses = abs(sum(p['realized_pnl'] for p in losing_trades))
+        wins = perf['wins']
+        losses = perf['losses']
+        total_wins = perf['sum_wins']
+        total_losses = abs(perf['sum_losses'])
         
         return {
-            'total_trades': len(closed_positions),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': (len(winning_trades) / len(closed_positions)) * 100 if closed_positions else 0,
+            'total_trades': closed,
+            'winning_trades': wins,
+            'losing_trades': losses,
+            'win_rate': (wins / closed) * 100,
             'total_pnl': self.total_pnl,
-            'average_win': total_wins / len(winning_trades) if winning_trades else 0,
-            'average_loss': total_losses / len(losing_trades) if losing_trades else 0,
+            'average_win': total_wins / wins if wins else 0,
+            'average_loss': total_losses / losses if losses else 0,
             'profit_factor': total_wins / total_losses if total_losses > 0 else float('inf'),
-            'max_win': max(p['realized_pnl'] for p in winning_trades) if winning_trades else 0,
-            'max_loss': min(p['realized_pnl'] for p in losing_trades) if losing_trades else 0
+            'max_win': perf['max_win'],
+            'max_loss': perf['max_loss']
         }
     
+    @staticmethod
+    def _fetch_symbol_bundle(market_data, symbol: str, columns: List[str]):
+        """Fetch the near-ATM option chain and underlying price for one symbol"""
+        expiry_dates = market_data.get_expiry_dates(symbol)
+        if not expiry_dates:
+            return None, 0
+        
+        # Get option chain, trimmed to near-ATM strikes and the columns signals use
+        underlying_price = market_data.get_live_price(symbol).get('ltp', 0)
+        option_chain = market_data.get_option_chain(
+            symbol, expiry_dates[0], atm_price=underlying_price,
+            strikes_window=AUTO_TRADE_STRIKES_WINDOW, columns=columns
+        )
+        return option_chain, underlying_price
+    
     def auto_paper_trade_top_movers(self, market_data, signal_engine):
         """Automatically paper trade top gainers and losers"""
         if not self.auto_paper_trade or self.trades_today >= self.max_daily_trades:
@@ -393,17 +701,23 @@ class PaperTradingEngine:
             # Generate signals for top movers
             symbols_to_trade = ['NIFTY', 'BANKNIFTY', 'FINNIFTY']
             
-            for symbol in symbols_to_trade:
-                if self.trades_today >= self.max_daily_trades:
-                    break
-                
-                # Get option chain
-                expiry_dates = market_data.get_expiry_dates(symbol)
-                if expiry_dates:
-                    option_chain = market_data.get_option_chain(symbol, expiry_dates[0])
-                    underlying_price = market_data.get_live_price(symbol).get('ltp', 0)
+            # Market data fetches are network-bound, so run them for all symbols at once
+            with ThreadPoolExecutor(max_workers=len(symbols_to_trade)) as executor:
+                bundles = {
+                    symbol: executor.submit(
+                        self._fetch_symbol_bundle, market_data, symbol, signal_engine.CHAIN_COLUMNS
+                    )
+                    for symbol in symbols_to_trade
+                }
+            
+            # Persist once after the loop rather than after every trade
+            with self._batch_saves():
+                for symbol, bundle in bundles.items():
+                    if self.trades_today >= self.max_daily_trades:
+                        break
                     
-                    if not option_chain.empty and underlying_price > 0:
+                    option_chain, underlying_price = bundle.result()
+                    if option_chain is not None and not option_chain.empty and underlying_price > 0:
                         signals = signal_engine.generate_signals(
                             symbol, option_chain, underlying_price, {}
                         )
@@ -423,3 +737,5 @@ class PaperTradingEngine:
         """Reset daily counters (call this at market open)"""
         self.trades_today = 0
         self.daily_pnl = 0
+        self.daily_pnl_date = datetime.now().date().isoformat()
+        self._dirty.add('portfolio')
@@ -2,246 +2,253 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.linecharts import HorizontalLineChart
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics import renderPDF
 import xlsxwriter
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import base64
+import plotly.io as pio
 from io import BytesIO
+from core.journal import TradeJournal
+from core.paper_trade import PaperTradingEngine
+from core.signals import AISignalEngine
+
+REPORT_CACHE_TTL = 60  # seconds a journal query result is reused across reports
+
+# ReportLab styles are immutable once built, so they are shared by every report
+_STYLES = getSampleStyleSheet()
+
+# Default look-back per report type when no start date is given
+_REPORT_RANGES = {
+    'Daily Summary': timedelta(days=1),
+    'Weekly Report': timedelta(weeks=1),
+    'Monthly Report': timedelta(days=30)
+}
+
+# Bound str.format callables for the per-row table cells
+_format_money = '₹{:,.2f}'.format
+_format_price = '₹{:.2f}'.format
+_format_strike = '₹{:.0f}'.format
+_format_rate = '{:.1f}%'.format
+_format_confidence = '{:.0f}%'.format
+
+# Risk table status thresholds, one entry per row (win rate, profit factor,
+# negated max drawdown, Sharpe ratio): above HIGH gets the high label, above
+# MID the mid label, anything else the default
+_RISK_STATUS_HIGH = np.array([60.0, 2.0, -10000.0, 1.0])
+_RISK_STATUS_MID = np.array([60.0, 1.0, -10000.0, 1.0])
+_RISK_STATUS_HIGH_LABELS = np.array(['Good', 'Excellent', 'Good', 'Good'])
+_RISK_STATUS_MID_LABELS = np.array(['Good', 'Good', 'Good', 'Good'])
+_RISK_STATUS_DEFAULT_LABELS = np.array(['Needs Improvement', 'Poor', 'Monitor', 'Average'])
+
+# Section builders (ReportGenerator._section_<name>) making up each PDF, in order
+_PDF_REPORT_SECTIONS = ('summary', 'trades', 'analytics', 'charts', 'risk', 'ai_metrics')
+# Sections for a period without trades: per-symbol analytics and charts have nothing to show
+_EMPTY_PDF_REPORT_SECTIONS = ('summary', 'trades', 'risk', 'ai_metrics')
+_AI_LEARNING_REPORT_SECTIONS = ('ai_learning', 'parameters', 'recommendations')
+
+_REPORT_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    alignment=1,  # Center alignment
+    textColor=colors.darkblue
+)
+
+_AI_REPORT_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=16,
+    spaceAfter=30,
+    alignment=1,
+    textColor=colors.darkblue
+)
+
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_TRADE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_SYMBOL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_RISK_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.red),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_AI_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_PARAM_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.green),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, journal: Optional[TradeJournal] = None,
+                 paper_engine: Optional[PaperTradingEngine] = None,
+                 signal_engine: Optional[AISignalEngine] = None):
         self.output_dir = 'data/reports'
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Shared components; pass the app's live instances so reports reflect their state.
+        # Any not supplied are constructed on first use and reused afterwards.
+        self._journal = journal
+        self._paper = paper_engine
+        self._signals = signal_engine
+        
+        # (query name, args, kwargs) -> (fetched_at, result), valid for one journal data_version
+        self._query_cache = {}
+        self._query_version = None
+        
+    @property
+    def journal(self) -> TradeJournal:
+        """Trade journal used for report queries"""
+        if self._journal is None:
+            self._journal = TradeJournal()
+        return self._journal
+    
+    def _journal_query(self, name: str, *args, **kwargs):
+        """Run a journal query, reusing a recent result if the journal has not changed"""
+        journal = self.journal
+        if journal.data_version != self._query_version:
+            self._query_cache.clear()
+            self._query_version = journal.data_version
+        
+        key = (name, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        cached = self._query_cache.get(key)
+        if cached is not None and now - cached[0] < REPORT_CACHE_TTL:
+            return cached[1]
+        
+        result = getattr(journal, name)(*args, **kwargs)
+        self._query_cache[key] = (now, result)
+        return result
+    
+    @staticmethod
+    def _resolve_range(report_type: str, start_date: datetime = None, end_date: datetime = None):
+        """Fill in a missing report period from the report type"""
+        if not end_date:
+            end_date = datetime.now()
+        if not start_date:
+            start_date = end_date - _REPORT_RANGES.get(report_type, timedelta(days=30))
+        return start_date, end_date
+    
+    def _make_path(self, report_type: str, end_date: datetime, ext: str) -> str:
+        """Output path for a report of the given type and period end"""
+        filename = f"{report_type.lower().replace(' ', '_')}_{end_date.strftime('%Y%m%d')}.{ext}"
+        return os.path.join(self.output_dir, filename)
+    
+    @property
+    def paper_engine(self) -> PaperTradingEngine:
+        """Paper trading engine supplying portfolio figures"""
+        if self._paper is None:
+            self._paper = PaperTradingEngine()
+        return self._paper
+    
+    @property
+    def signal_engine(self) -> AISignalEngine:
+        """Signal engine supplying AI learning metrics"""
+        if self._signals is None:
+            self._signals = AISignalEngine()
+        return self._signals
+    
     def generate_pdf_report(self, report_type: str, start_date: datetime = None, 
-                           end_date: datetime = None) -> str:
-        """Generate comprehensive PDF report"""
+                           end_date: datetime = None, include_charts: bool = False) -> str:
+        """Generate comprehensive PDF report, optionally embedding the performance charts"""
         try:
-            # Import journal and other components
-            from core.journal import TradeJournal
-            from core.paper_trade import PaperTradingEngine
-            
-            journal = TradeJournal()
-            paper_engine = PaperTradingEngine()
-            
-            # Set date range
-            if not end_date:
-                end_date = datetime.now()
-            if not start_date:
-                if report_type == "Daily Summary":
-                    start_date = end_date - timedelta(days=1)
-                elif report_type == "Weekly Report":
-                    start_date = end_date - timedelta(weeks=1)
-                elif report_type == "Monthly Report":
-                    start_date = end_date - timedelta(days=30)
-                else:
-                    start_date = end_date - timedelta(days=30)
-            
-            # Generate filename
-            filename = f"{report_type.lower().replace(' ', '_')}_{end_date.strftime('%Y%m%d')}.pdf"
-            filepath = os.path.join(self.output_dir, filename)
+            paper_engine = self.paper_engine
+            generated_at = datetime.now()
+            
+            start_date, end_date = self._resolve_range(report_type, start_date, end_date or generated_at)
+            filepath = self._make_path(report_type, end_date, 'pdf')
+            
+            portfolio_summary = paper_engine.get_performance_summary()
+            days_back = (end_date - start_date).days
+            # Only the last 10 trades are shown in the PDF, so let SQL do the cut
+            recent_trades = self._journal_query('get_trade_history', max(days_back, 7), limit=10)
+            
+            # No trades in the period (fresh account or quiet period): skip the
+            # symbol query and charts, but keep the portfolio, risk and AI sections
+            period_empty = recent_trades.empty
+            sections = _EMPTY_PDF_REPORT_SECTIONS if period_empty else _PDF_REPORT_SECTIONS
+            
+            data = {
+                'portfolio_summary': portfolio_summary,
+                'trade_analysis': self._journal_query('get_trade_analysis'),
+                'recent_trades': recent_trades,
+                'symbol_performance': None if period_empty else self._journal_query('get_symbol_performance'),
+                'chart_days': max(days_back, 7) if include_charts and not period_empty else None
+            }
             
             # Create PDF document
             doc = SimpleDocTemplate(filepath, pagesize=A4)
-            styles = getSampleStyleSheet()
+            styles = _STYLES
             story = []
             
             # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                spaceAfter=30,
-                alignment=1,  # Center alignment
-                textColor=colors.darkblue
-            )
-            
-            story.append(Paragraph(f"AI Options Trader Agent - {report_type}", title_style))
+            story.append(Paragraph(f"AI Options Trader Agent - {report_type}", _REPORT_TITLE_STYLE))
             story.append(Paragraph(f"Report Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}", 
                                  styles['Normal']))
             story.append(Spacer(1, 20))
             
-            # Executive Summary
-            story.append(Paragraph("Executive Summary", styles['Heading2']))
-            
-            # Get portfolio summary
-            portfolio_summary = paper_engine.get_performance_summary()
-            trade_analysis = journal.get_trade_analysis()
-            
-            summary_data = [
-                ["Metric", "Value"],
-                ["Total Portfolio Value", f"₹{paper_engine.get_portfolio_value():,.2f}"],
-                ["Daily P&L", f"₹{paper_engine.get_daily_pnl():,.2f}"],
-                ["Total Trades", str(portfolio_summary.get('total_trades', 0))],
-                ["Win Rate", f"{portfolio_summary.get('win_rate', 0):.1f}%"],
-                ["Profit Factor", f"{portfolio_summary.get('profit_factor', 0):.2f}"],
-                ["Max Drawdown", f"₹{trade_analysis.get('max_drawdown', 0):,.2f}"]
-            ]
-            
-            summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(summary_table)
-            story.append(Spacer(1, 20))
-            
-            # Trade History
-            story.append(Paragraph("Recent Trade History", styles['Heading2']))
-            
-            # Get recent trades
-            days_back = (end_date - start_date).days
-            trade_history = journal.get_trade_history(days=max(days_back, 7))
-            
-            if not trade_history.empty:
-                # Limit to last 10 trades for PDF
-                recent_trades = trade_history.head(10)
-                
-                trade_data = [["Symbol", "Type", "Strike", "Entry Price", "Exit Price", "P&L", "Confidence"]]
-                
-                for _, trade in recent_trades.iterrows():
-                    trade_data.append([
-                        str(trade.get('symbol', '')),
-                        str(trade.get('option_type', '')),
-                        f"₹{trade.get('strike', 0):.0f}",
-                        f"₹{trade.get('entry_price', 0):.2f}",
-                        f"₹{trade.get('exit_price', 0):.2f}" if trade.get('exit_price') else "Open",
-                        f"₹{trade.get('pnl', 0):,.2f}",
-                        f"{trade.get('confidence', 0):.0f}%"
-                    ])
-                
-                trade_table = Table(trade_data, colWidths=[0.8*inch, 0.6*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.8*inch])
-                trade_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                story.append(trade_table)
-            else:
-                story.append(Paragraph("No trades found for the selected period.", styles['Normal']))
-            
-            story.append(Spacer(1, 20))
-            
-            # Performance Analytics
-            story.append(Paragraph("Performance Analytics", styles['Heading2']))
-            
-            # Symbol-wise performance
-            symbol_performance = journal.get_symbol_performance()
-            
-            if not symbol_performance.empty:
-                symbol_data = [["Symbol", "Total Trades", "Win Rate", "Total P&L", "Avg P&L", "Best Trade"]]
-                
-                for _, row in symbol_performance.head(5).iterrows():
-                    symbol_data.append([
-                        str(row.get('symbol', '')),
-                        str(row.get('total_trades', 0)),
-                        f"{row.get('win_rate', 0):.1f}%",
-                        f"₹{row.get('total_pnl', 0):,.2f}",
-                        f"₹{row.get('avg_pnl', 0):,.2f}",
-                        f"₹{row.get('best_trade', 0):,.2f}"
-                    ])
-                
-                symbol_table = Table(symbol_data, colWidths=[1*inch, 1*inch, 1*inch, 1.2*inch, 1*inch, 1*inch])
-                symbol_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                story.append(symbol_table)
-            
-            story.append(Spacer(1, 20))
-            
-            # Risk Analysis
-            story.append(Paragraph("Risk Analysis", styles['Heading2']))
-            
-            risk_metrics = [
-                ["Risk Metric", "Value", "Status"],
-                ["Win Rate", f"{portfolio_summary.get('win_rate', 0):.1f}%", 
-                 "Good" if portfolio_summary.get('win_rate', 0) > 60 else "Needs Improvement"],
-                ["Profit Factor", f"{portfolio_summary.get('profit_factor', 0):.2f}",
-                 "Excellent" if portfolio_summary.get('profit_factor', 0) > 2 else "Good" if portfolio_summary.get('profit_factor', 0) > 1 else "Poor"],
-                ["Max Drawdown", f"₹{trade_analysis.get('max_drawdown', 0):,.2f}",
-                 "Good" if abs(trade_analysis.get('max_drawdown', 0)) < 10000 else "Monitor"],
-                ["Sharpe Ratio", f"{trade_analysis.get('sharpe_ratio', 0):.2f}",
-                 "Good" if trade_analysis.get('sharpe_ratio', 0) > 1 else "Average"]
-            ]
-            
-            risk_table = Table(risk_metrics, colWidths=[2*inch, 1.5*inch, 1.5*inch])
-            risk_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.red),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(risk_table)
-            story.append(Spacer(1, 20))
-            
-            # AI Performance
-            story.append(Paragraph("AI Performance Metrics", styles['Heading2']))
-            
-            # This would be populated from AI learning data
-            ai_metrics = [
-                ["AI Metric", "Current Value", "Target"],
-                ["Prediction Accuracy", "75.2%", ">80%"],
-                ["Average Confidence", "68.5%", ">70%"],
-                ["False Positive Rate", "15.3%", "<20%"],
-                ["Learning Progress", "Improving", "Stable Growth"]
-            ]
-            
-            ai_table = Table(ai_metrics, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-            ai_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(ai_table)
-            story.append(Spacer(1, 20))
+            story.extend(self._build_sections(sections, data))
             
             # Footer
             story.append(Paragraph("---", styles['Normal']))
-            story.append(Paragraph(f"Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
+            story.append(Paragraph(f"Report generated on {generated_at.strftime('%Y-%m-%d %H:%M:%S')}", 
                                  styles['Italic']))
             story.append(Paragraph("AI Options Trader Agent v1.0", styles['Italic']))
             
@@ -254,36 +261,235 @@ class ReportGenerator:
             print(f"Error generating PDF report: {e}")
             return None
     
+    def _build_sections(self, names, data: Dict) -> List:
+        """Concatenate the flowables of the named report sections"""
+        story = []
+        for name in names:
+            story.extend(getattr(self, f'_section_{name}')(data))
+        return story
+    
+    def _table_section(self, heading: Optional[str], rows: List, col_widths: List,
+                       table_style: TableStyle, empty_text: Optional[str] = None) -> List:
+        """Heading plus table flowables for a section, built fresh for every report"""
+        flowables = []
+        if heading:
+            flowables.append(Paragraph(heading, _STYLES['Heading2']))
+        
+        if len(rows) > 1:
+            table = Table(rows, colWidths=col_widths)
+            table.setStyle(table_style)
+            flowables.append(table)
+        elif empty_text:
+            flowables.append(Paragraph(empty_text, _STYLES['Normal']))
+        
+        flowables.append(Spacer(1, 20))
+        
+        return flowables
+    
+    def _section_summary(self, data: Dict) -> List:
+        """Executive summary of the portfolio"""
+        paper_engine = self.paper_engine
+        portfolio_summary = data['portfolio_summary']
+        
+        summary_data = [
+            ["Metric", "Value"],
+            ["Total Portfolio Value", f"₹{paper_engine.get_portfolio_value():,.2f}"],
+            ["Daily P&L", f"₹{paper_engine.get_daily_pnl():,.2f}"],
+            ["Total Trades", str(portfolio_summary.get('total_trades', 0))],
+            ["Win Rate", f"{portfolio_summary.get('win_rate', 0):.1f}%"],
+            ["Profit Factor", f"{portfolio_summary.get('profit_factor', 0):.2f}"],
+            ["Max Drawdown", f"₹{data['trade_analysis'].get('max_drawdown', 0):,.2f}"]
+        ]
+        
+        return self._table_section("Executive Summary", summary_data,
+                                   [3*inch, 2*inch], _SUMMARY_TABLE_STYLE)
+    
+    def _section_trades(self, data: Dict) -> List:
+        """Most recent trades"""
+        trade_data = [["Symbol", "Type", "Strike", "Entry Price", "Exit Price", "P&L", "Confidence"]]
+        
+        trade_columns = ['symbol', 'option_type', 'strike', 'entry_price', 'exit_price', 'pnl', 'confidence']
+        recent_trades = data['recent_trades']
+        if not recent_trades.empty:
+            for symbol, option_type, strike, entry_price, exit_price, pnl, confidence in \
+                    recent_trades[trade_columns].itertuples(index=False, name=None):
+                trade_data.append([
+                    str(symbol),
+                    str(option_type),
+                    _format_strike(strike),
+                    _format_price(entry_price),
+                    _format_price(exit_price) if pd.notna(exit_price) and exit_price else "Open",
+                    _format_money(pnl),
+                    _format_confidence(confidence)
+                ])
+        
+        return self._table_section("Recent Trade History", trade_data,
+                                   [0.8*inch, 0.6*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 0.8*inch],
+                                    _TRADE_TABLE_STYLE, empty_text="No trades found for the selected period.")
+    
+    def _section_analytics(self, data: Dict) -> List:
+        """Symbol-wise performance of the top symbols"""
+        symbol_data = [["Symbol", "Total Trades", "Win Rate", "Total P&L", "Avg P&L", "Best Trade"]]
+        
+        symbol_columns = ['symbol', 'total_trades', 'win_rate', 'total_pnl', 'avg_pnl', 'best_trade']
+        symbol_performance = data['symbol_performance']
+        if not symbol_performance.empty:
+            for symbol, total_trades, win_rate, total_pnl, avg_pnl, best_trade in \
+                    symbol_performance[symbol_columns].head(5).itertuples(index=False, name=None):
+                symbol_data.append([
+                    str(symbol),
+                    str(total_trades),
+                    _format_rate(win_rate),
+                    _format_money(total_pnl),
+                    _format_money(avg_pnl),
+                    _format_money(best_trade)
+                ])
+        
+        return self._table_section("Performance Analytics", symbol_data,
+                                   [1*inch, 1*inch, 1*inch, 1.2*inch, 1*inch, 1*inch], _SYMBOL_TABLE_STYLE)
+    
+    def _section_charts(self, data: Dict) -> List:
+        """Performance charts, rendered in memory (no PNG files are written)"""
+        if data['chart_days'] is None:
+            return []
+        
+        chart_images = self.render_performance_charts(data['chart_days'])
+        if not chart_images:
+            return []
+        
+        flowables = [Paragraph("Performance Charts", _STYLES['Heading2'])]
+        for chart_image in chart_images:
+            flowables.append(Image(chart_image, width=6*inch, height=3*inch))
+            flowables.append(Spacer(1, 10))
+        flowables.append(Spacer(1, 10))
+        
+        return flowables
+    
+    def _section_risk(self, data: Dict) -> List:
+        """Risk metrics with their status labels"""
+        portfolio_summary = data['portfolio_summary']
+        trade_analysis = data['trade_analysis']
+        
+        win_rate = portfolio_summary.get('win_rate', 0)
+        profit_factor = portfolio_summary.get('profit_factor', 0)
+        max_drawdown = trade_analysis.get('max_drawdown', 0)
+        sharpe_ratio = trade_analysis.get('sharpe_ratio', 0)
+        
+        # Drawdown is negated so every metric is "higher is better"
+        risk_values = np.array([win_rate, profit_factor, -abs(max_drawdown), sharpe_ratio], dtype=float)
+        risk_status = np.select(
+            [risk_values > _RISK_STATUS_HIGH, risk_values > _RISK_STATUS_MID],
+            [_RISK_STATUS_HIGH_LABELS, _RISK_STATUS_MID_LABELS],
+            default=_RISK_STATUS_DEFAULT_LABELS
+        ).tolist()
+        
+        risk_metrics = [
+            ["Risk Metric", "Value", "Status"],
+            ["Win Rate", f"{win_rate:.1f}%", risk_status[0]],
+            ["Profit Factor", f"{profit_factor:.2f}", risk_status[1]],
+            ["Max Drawdown", f"₹{max_drawdown:,.2f}", risk_status[2]],
+            ["Sharpe Ratio", f"{sharpe_ratio:.2f}", risk_status[3]]
+        ]
+        
+        return self._table_section("Risk Analysis", risk_metrics,
+                                   [2*inch, 1.5*inch, 1.5*inch], _RISK_TABLE_STYLE)
+    
+    def _section_ai_metrics(self, data: Dict) -> List:
+        """AI performance against its targets"""
+        # This would be populated from AI learning data
+        ai_metrics = [
+            ["AI Metric", "Current Value", "Target"],
+            ["Prediction Accuracy", "75.2%", ">80%"],
+            ["Average Confidence", "68.5%", ">70%"],
+            ["False Positive Rate", "15.3%", "<20%"],
+            ["Learning Progress", "Improving", "Stable Growth"]
+        ]
+        
+        return self._table_section("AI Performance Metrics", ai_metrics,
+                                   [2.5*inch, 1.5*inch, 1.5*inch], _AI_TABLE_STYLE)
+    
+    def _section_ai_learning(self, data: Dict) -> List:
+        """Current AI learning metrics"""
+        signal_engine = self.signal_engine
+        accuracy = data['accuracy']
+        avg_confidence = data['avg_confidence']
+        learning_progress = data['learning_progress']
+        
+        ai_data = [
+            ["AI Metric", "Current Value", "Status"],
+            ["Prediction Accuracy", f"{accuracy:.1f}%", "Good" if accuracy > 70 else "Needs Improvement"],
+            ["Average Confidence", f"{avg_confidence:.1f}%", "Good" if avg_confidence > 65 else "Average"],
+            ["Learning Data Points", str(len(signal_engine.learning_data)), "Active"],
+            ["Model Status", "Trained" if signal_engine.model_trained else "Training", ""],
+            ["Learning Trend", "Improving" if len(learning_progress) > 5 and learning_progress[-1] > learning_progress[0] else "Stable", ""]
+        ]
+        
+        return self._table_section(None, ai_data,
+                                   [2.5*inch, 1.5*inch, 1.5*inch], _AI_TABLE_STYLE)
+    
+    def _section_parameters(self, data: Dict) -> List:
+        """Signal parameter weights"""
+        weights = self.signal_engine.parameter_weights
+        param_importance = [
+            ["Parameter", "Weight", "Importance"],
+            ["Delta", f"{weights['delta']:.2f}", "High"],
+            ["OI Change", f"{weights['oi_change']:.2f}", "High"],
+            ["Volume", f"{weights['volume']:.2f}", "Medium"],
+            ["Momentum", f"{weights['momentum']:.2f}", "Medium"],
+            ["Implied Volatility", f"{weights['iv']:.2f}", "Low"],
+            ["Spread Quality", f"{weights['spread']:.2f}", "Low"]
+        ]
+        
+        return self._table_section("Parameter Importance in AI Decisions", param_importance,
+                                   [2.5*inch, 1*inch, 1.5*inch], _PARAM_TABLE_STYLE)
+    
+    def _section_recommendations(self, data: Dict) -> List:
+        """Learning recommendations derived from the AI metrics"""
+        recommendations = []
+        
+        if data['accuracy'] < 70:
+            recommendations.append("• Increase training data by extending paper trading period")
+            recommendations.append("• Review parameter weights for better signal accuracy")
+        
+        if data['avg_confidence'] < 65:
+            recommendations.append("• Adjust confidence threshold for more selective trading")
+            recommendations.append("• Focus on higher probability setups")
+        
+        if len(data['learning_progress']) < 10:
+            recommendations.append("• Continue paper trading to gather more learning data")
+            recommendations.append("• Monitor AI performance over extended periods")
+        
+        if not recommendations:
+            recommendations.append("• AI performance is satisfactory")
+            recommendations.append("• Continue current learning approach")
+        
+        flowables = [Paragraph("AI Learning Recommendations", _STYLES['Heading2'])]
+        flowables.extend(Paragraph(rec, _STYLES['Normal']) for rec in recommendations)
+        flowables.append(Spacer(1, 20))
+        
+        return flowables
+    
     def generate_excel_report(self, report_type: str, start_date: datetime = None, 
                              end_date: datetime = None) -> str:
         """Generate comprehensive Excel report"""
         try:
-            # Import required components
-            from core.journal import TradeJournal
-            from core.paper_trade import PaperTradingEngine
-            
-            journal = TradeJournal()
-            paper_engine = PaperTradingEngine()
-            
-            # Set date range
-            if not end_date:
-                end_date = datetime.now()
-            if not start_date:
-                if report_type == "Daily Summary":
-                    start_date = end_date - timedelta(days=1)
-                elif report_type == "Weekly Report":
-                    start_date = end_date - timedelta(weeks=1)
-                elif report_type == "Monthly Report":
-                    start_date = end_date - timedelta(days=30)
-                else:
-                    start_date = end_date - timedelta(days=30)
-            
-            # Generate filename
-            filename = f"{report_type.lower().replace(' ', '_')}_{end_date.strftime('%Y%m%d')}.xlsx"
-            filepath = os.path.join(self.output_dir, filename)
+            paper_engine = self.paper_engine
             
-            # Create Excel workbook
-            workbook = xlsxwriter.Workbook(filepath)
+            start_date, end_date = self._resolve_range(report_type, start_date, end_date)
+            filepath = self._make_path(report_type, end_date, 'xlsx')
+            
+            portfolio_summary = paper_engine.get_performance_summary()
+            days_back = (end_date - start_date).days
+            # The trade sheet is streamed later; here we only need to know it has rows
+            latest_trade = self._journal_query('get_trade_history', max(days_back, 30), limit=1)
+            
+            # Create Excel workbook; constant_memory streams each row to disk so
+            # rows must be written in order (column formats are set up front)
+            workbook = xlsxwriter.Workbook(filepath, {
+                'constant_memory': True,
+                'use_zip64': True,
+                'strings_to_numbers': False
+            })
             
             # Define formats
             header_format = workbook.add_format({
@@ -320,8 +526,7 @@ class ReportGenerator:
             summary_sheet.write('A1', 'AI Options Trader Agent - Summary Report', header_format)
             summary_sheet.merge_range('A1:B1', 'AI Options Trader Agent - Summary Report', header_format)
             
-            portfolio_summary = paper_engine.get_performance_summary()
-            trade_analysis = journal.get_trade_analysis()
+            trade_analysis = self._journal_query('get_trade_analysis')
             
             row = 3
             summary_data = [
@@ -343,87 +548,65 @@ class ReportGenerator:
                 summary_sheet.write(row + 1 + i, 0, metric, cell_format)
                 summary_sheet.write(row + 1 + i, 1, value, format_style)
             
+            # No trades in the period (fresh account or quiet period): the summary
+            # is all there is to report, so skip the remaining queries and sheets
+            if latest_trade.empty:
+                summary_sheet.write(row + 2 + len(summary_data), 0, 'No trades found for the selected period.')
+                workbook.close()
+                return filepath
+            
             # Trade History Sheet
             trade_sheet = workbook.add_worksheet('Trade History')
             
-            days_back = (end_date - start_date).days
-            trade_history = journal.get_trade_history(days=max(days_back, 30))
+            headers = ['ID', 'Symbol', 'Type', 'Strike', 'Entry Price', 'Exit Price', 
+                      'Entry Time', 'Exit Time', 'P&L', 'Confidence', 'Status', 'Reasoning']
+            trade_formats = [cell_format, cell_format, cell_format, cell_format, money_format, money_format,
+                             cell_format, cell_format, money_format, percent_format, cell_format, cell_format]
             
-            if not trade_history.empty:
-                # Headers
-                headers = ['ID', 'Symbol', 'Type', 'Strike', 'Entry Price', 'Exit Price', 
-                          'Entry Time', 'Exit Time', 'P&L', 'Confidence', 'Status', 'Reasoning']
-                
-                for col, header in enumerate(headers):
-                    trade_sheet.write(0, col, header, header_format)
-                
-                # Data
-                for row, (_, trade) in enumerate(trade_history.iterrows(), 1):
-                    trade_sheet.write(row, 0, str(trade.get('id', '')), cell_format)
-                    trade_sheet.write(row, 1, str(trade.get('symbol', '')), cell_format)
-                    trade_sheet.write(row, 2, str(trade.get('option_type', '')), cell_format)
-                    trade_sheet.write(row, 3, trade.get('strike', 0), cell_format)
-                    trade_sheet.write(row, 4, trade.get('entry_price', 0), money_format)
-                    trade_sheet.write(row, 5, trade.get('exit_price', 0) if trade.get('exit_price') else '', money_format)
-                    trade_sheet.write(row, 6, str(trade.get('entry_time', '')), cell_format)
-                    trade_sheet.write(row, 7, str(trade.get('exit_time', '')), cell_format)
-                    trade_sheet.write(row, 8, trade.get('pnl', 0), money_format)
-                    trade_sheet.write(row, 9, trade.get('confidence', 0)/100, percent_format)
-                    trade_sheet.write(row, 10, str(trade.get('status', '')), cell_format)
-                    trade_sheet.write(row, 11, str(trade.get('reasoning', ''))[:100], cell_format)
-                
-                # Auto-fit columns
-                for col in range(len(headers)):
-                    trade_sheet.set_column(col, col, 15)
+            self._write_sheet_table(trade_sheet, headers, header_format, trade_formats,
+                                    self._trade_sheet_rows(max(days_back, 30)))
             
             # Daily Performance Sheet
             daily_sheet = workbook.add_worksheet('Daily Performance')
             
-            daily_performance = journal.get_daily_performance(days=30)
+            daily_performance = self._journal_query('get_daily_performance', 30)
             
             if not daily_performance.empty:
                 daily_headers = ['Date', 'Total Trades', 'Winning Trades', 'Win Rate', 
                                'Daily P&L', 'Avg Confidence']
+                daily_formats = [cell_format, cell_format, cell_format, percent_format, money_format, percent_format]
                 
-                for col, header in enumerate(daily_headers):
-                    daily_sheet.write(0, col, header, header_format)
-                
-                for row, (_, day) in enumerate(daily_performance.iterrows(), 1):
-                    daily_sheet.write(row, 0, day.get('trade_date', ''), cell_format)
-                    daily_sheet.write(row, 1, day.get('total_trades', 0), cell_format)
-                    daily_sheet.write(row, 2, day.get('winning_trades', 0), cell_format)
-                    daily_sheet.write(row, 3, day.get('win_rate', 0)/100, percent_format)
-                    daily_sheet.write(row, 4, day.get('daily_pnl', 0), money_format)
-                    daily_sheet.write(row, 5, day.get('avg_confidence', 0)/100, percent_format)
+                daily_columns = ['trade_date', 'total_trades', 'winning_trades', 'win_rate', 'daily_pnl', 'avg_confidence']
+                daily_rows = daily_performance[daily_columns].assign(
+                    # Python datetimes survive to_records().tolist(); datetime64 would become integers
+                    trade_date=daily_performance['trade_date'].dt.to_pydatetime(),
+                    win_rate=daily_performance['win_rate'].to_numpy(dtype=np.float64) / 100,
+                    avg_confidence=daily_performance['avg_confidence'].to_numpy(dtype=np.float64) / 100
+                )
                 
-                for col in range(len(daily_headers)):
-                    daily_sheet.set_column(col, col, 15)
+                self._write_sheet_table(daily_sheet, daily_headers, header_format, daily_formats,
+                                        daily_rows.to_records(index=False).tolist())
             
             # Symbol Performance Sheet
             symbol_sheet = workbook.add_worksheet('Symbol Performance')
-            
-            symbol_performance = journal.get_symbol_performance()
+            symbol_performance = self._journal_query('get_symbol_performance')
             
             if not symbol_performance.empty:
                 symbol_headers = ['Symbol', 'Total Trades', 'Winning Trades', 'Win Rate',
                                 'Total P&L', 'Avg P&L', 'Best Trade', 'Worst Trade', 'Avg Confidence']
+                symbol_formats = [cell_format, cell_format, cell_format, percent_format, money_format,
+                                  money_format, money_format, money_format, percent_format]
                 
-                for col, header in enumerate(symbol_headers):
-                    symbol_sheet.write(0, col, header, header_format)
-                
-                for row, (_, symbol) in enumerate(symbol_performance.iterrows(), 1):
-                    symbol_sheet.write(row, 0, str(symbol.get('symbol', '')), cell_format)
-                    symbol_sheet.write(row, 1, symbol.get('total_trades', 0), cell_format)
-                    symbol_sheet.write(row, 2, symbol.get('winning_trades', 0), cell_format)
-                    symbol_sheet.write(row, 3, symbol.get('win_rate', 0)/100, percent_format)
-                    symbol_sheet.write(row, 4, symbol.get('total_pnl', 0), money_format)
-                    symbol_sheet.write(row, 5, symbol.get('avg_pnl', 0), money_format)
-                    symbol_sheet.write(row, 6, symbol.get('best_trade', 0), money_format)
-                    symbol_sheet.write(row, 7, symbol.get('worst_trade', 0), money_format)
-                    symbol_sheet.write(row, 8, symbol.get('avg_confidence', 0)/100, percent_format)
+                symbol_columns = ['symbol', 'total_trades', 'winning_trades', 'win_rate', 'total_pnl',
+                                  'avg_pnl', 'best_trade', 'worst_trade', 'avg_confidence']
+                symbol_rows = symbol_performance[symbol_columns].assign(
+                    symbol=symbol_performance['symbol'].astype(str),
+                    win_rate=symbol_performance['win_rate'].to_numpy(dtype=np.float64) / 100,
+                    avg_confidence=symbol_performance['avg_confidence'].to_numpy(dtype=np.float64) / 100
+                )
                 
-                for col in range(len(symbol_headers)):
-                    symbol_sheet.set_column(col, col, 15)
+                self._write_sheet_table(symbol_sheet, symbol_headers, header_format, symbol_formats,
+                                        symbol_rows.to_records(index=False).tolist())
             
             workbook.close()
             
@@ -433,98 +616,157 @@ class ReportGenerator:
             print(f"Error generating Excel report: {e}")
             return None
     
+    @staticmethod
+    def _write_sheet_table(sheet, headers: List[str], header_format, column_formats: List, rows) -> int:
+        """Write a header row, per-column formats and then the data rows in order; returns the last row"""
+        sheet.write_row(0, 0, headers, header_format)
+        
+        # Column formats apply to every data cell written without its own format
+        for col, column_format in enumerate(column_formats):
+            sheet.set_column(col, col, 15, column_format)
+        
+        row = 0
+        for row, values in enumerate(rows, 1):
+            sheet.write_row(row, 0, values)
+        
+        return row
+    
+    def _trade_sheet_rows(self, days: int):
+        """Yield Excel rows for the trade history, streamed in chunks so memory stays flat"""
+        trade_columns = ['id', 'symbol', 'option_type', 'strike', 'entry_price', 'exit_price',
+                         'entry_time', 'exit_time', 'pnl', 'confidence', 'status', 'reasoning']
+        
+        for chunk in self.journal.iter_trade_history(days):
+            # Percent cells take fractions; convert the whole column at once
+            chunk = chunk[trade_columns].assign(confidence=chunk['confidence'].to_numpy(dtype=np.float64) / 100)
+            for (trade_id, symbol, option_type, strike, entry_price, exit_price, entry_time,
+                 exit_time, pnl, confidence, status, reasoning) in chunk.itertuples(index=False, name=None):
+                yield [
+                    str(trade_id), str(symbol), str(option_type), strike, entry_price,
+                    exit_price if pd.notna(exit_price) and exit_price else '',
+                    str(entry_time), str(exit_time), pnl, confidence, str(status), str(reasoning)[:100]
+                ]
+    
+    def generate_reports(self, report_type: str, start_date: datetime = None, end_date: datetime = None,
+                         pdf: bool = True, excel: bool = True) -> tuple:
+        """Generate the PDF and Excel reports side by side, returning (pdf_path, excel_path)"""
+        # Resolve the shared components up front so the workers don't race to create them
+        self.journal
+        self.paper_engine
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pdf_future = executor.submit(self.generate_pdf_report, report_type, start_date, end_date) if pdf else None
+            excel_future = executor.submit(self.generate_excel_report, report_type, start_date, end_date) if excel else None
+            
+            return (pdf_future.result() if pdf_future else None,
+                    excel_future.result() if excel_future else None)
+    
+    def _build_performance_charts(self, days: int) -> List[tuple]:
+        """Build the performance chart figures with their default PNG paths"""
+        trade_history = self._journal_query('get_trade_history', days)
+        
+        if trade_history.empty:
+            return []
+        
+        daily_performance = self._journal_query('get_daily_performance', days)
+        # One date stamp so all charts of a run share a filename date
+        stamp = datetime.now().strftime("%Y%m%d")
+        
+        def _pnl_chart():
+            # Prepare data
+            df_sorted = trade_history.sort_values('entry_time')
+            df_sorted['cumulative_pnl'] = df_sorted['pnl'].cumsum()
+            
+            # Create P&L curve
+            fig = go.Figure()
+            
+            fig.add_trace(go.Scatter(
+                x=df_sorted['entry_time'],
+                y=df_sorted['cumulative_pnl'],
+                mode='lines+markers',
+                name='Cumulative P&L',
+                line=dict(color='blue', width=2)
+            ))
+            
+            fig.update_layout(
+                title='Cumulative P&L Over Time',
+                xaxis_title='Date',
+                yaxis_title='Cumulative P&L (₹)',
+                hovermode='x unified'
+            )
+            
+            chart_path = os.path.join(self.output_dir, f'pnl_curve_{stamp}.png')
+            return fig, chart_path
+        
+        def _daily_chart():
+            if daily_performance.empty:
+                return None
+            
+            fig = go.Figure()
+            
+            colors = np.where(daily_performance['daily_pnl'].to_numpy() >= 0, 'green', 'red').tolist()
+            
+            fig.add_trace(go.Bar(
+                x=daily_performance['trade_date'],
+                y=daily_performance['daily_pnl'],
+                marker_color=colors,
+                name='Daily P&L'
+            ))
+            
+            fig.update_layout(
+                title='Daily P&L Performance',
+                xaxis_title='Date',
+                yaxis_title='Daily P&L (₹)',
+                showlegend=False
+            )
+            
+            chart_path = os.path.join(self.output_dir, f'daily_pnl_{stamp}.png')
+            return fig, chart_path
+        
+        def _winrate_chart():
+            if daily_performance.empty:
+                return None
+            
+            fig = go.Figure()
+            
+            fig.add_trace(go.Scatter(
+                x=daily_performance['trade_date'].tolist(),
+                y=daily_performance['win_rate'].tolist(),
+                mode='lines+markers',
+                name='Win Rate',
+                line=dict(color='orange', width=2)
+            ))
+            
+            fig.add_hline(y=50, line_dash="dash", line_color="gray", 
+                          annotation_text="Break-even (50%)")
+            
+            fig.update_layout(
+                title='Win Rate Trend',
+                xaxis_title='Date',
+                yaxis_title='Win Rate (%)',
+                yaxis=dict(range=[0, 100])
+            )
+            
+            chart_path = os.path.join(self.output_dir, f'win_rate_{stamp}.png')
+            return fig, chart_path
+        
+        # Build the figures from the shared frames
+        charts = (_pnl_chart(), _daily_chart(), _winrate_chart())
+        return [chart for chart in charts if chart]
+    
     def generate_performance_charts(self, days: int = 30) -> List[str]:
         """Generate performance charts as image files"""
         try:
-            from core.journal import TradeJournal
+            charts = self._build_performance_charts(days)
             
-            journal = TradeJournal()
-            chart_files = []
+            if not charts:
+                return []
             
-            # P&L Curve Chart
-            trade_history = journal.get_trade_history(days=days)
+            figures = [fig for fig, _ in charts]
+            chart_files = [chart_path for _, chart_path in charts]
             
-            if not trade_history.empty:
-                # Prepare data
-                df_sorted = trade_history.sort_values('entry_time')
-                df_sorted['cumulative_pnl'] = df_sorted['pnl'].cumsum()
-                
-                # Create P&L curve
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatter(
-                    x=df_sorted['entry_time'],
-                    y=df_sorted['cumulative_pnl'],
-                    mode='lines+markers',
-                    name='Cumulative P&L',
-                    line=dict(color='blue', width=2)
-                ))
-                
-                fig.update_layout(
-                    title='Cumulative P&L Over Time',
-                    xaxis_title='Date',
-                    yaxis_title='Cumulative P&L (₹)',
-                    hovermode='x unified'
-                )
-                
-                # Save chart
-                chart_path = os.path.join(self.output_dir, f'pnl_curve_{datetime.now().strftime("%Y%m%d")}.png')
-                fig.write_image(chart_path, width=800, height=400)
-                chart_files.append(chart_path)
-                
-                # Daily P&L Bar Chart
-                daily_performance = journal.get_daily_performance(days=days)
-                
-                if not daily_performance.empty:
-                    fig2 = go.Figure()
-                    
-                    colors = ['green' if pnl >= 0 else 'red' for pnl in daily_performance['daily_pnl']]
-                    
-                    fig2.add_trace(go.Bar(
-                        x=daily_performance['trade_date'],
-                        y=daily_performance['daily_pnl'],
-                        marker_color=colors,
-                        name='Daily P&L'
-                    ))
-                    
-                    fig2.update_layout(
-                        title='Daily P&L Performance',
-                        xaxis_title='Date',
-                        yaxis_title='Daily P&L (₹)',
-                        showlegend=False
-                    )
-                    
-                    chart_path = os.path.join(self.output_dir, f'daily_pnl_{datetime.now().strftime("%Y%m%d")}.png')
-                    fig2.write_image(chart_path, width=800, height=400)
-                    chart_files.append(chart_path)
-                
-                # Win Rate Chart
-                win_rate_data = daily_performance['win_rate'].tolist()
-                dates = daily_performance['trade_date'].tolist()
-                
-                fig3 = go.Figure()
-                
-                fig3.add_trace(go.Scatter(
-                    x=dates,
-                    y=win_rate_data,
-                    mode='lines+markers',
-                    name='Win Rate',
-                    line=dict(color='orange', width=2)
-                ))
-                
-                fig3.add_hline(y=50, line_dash="dash", line_color="gray", 
-                              annotation_text="Break-even (50%)")
-                
-                fig3.update_layout(
-                    title='Win Rate Trend',
-                    xaxis_title='Date',
-                    yaxis_title='Win Rate (%)',
-                    yaxis=dict(range=[0, 100])
-                )
-                
-                chart_path = os.path.join(self.output_dir, f'win_rate_{datetime.now().strftime("%Y%m%d")}.png')
-                fig3.write_image(chart_path, width=800, height=400)
-                chart_files.append(chart_path)
+            # Export together so Kaleido starts once
+            pio.write_images(figures, chart_files, width=800, height=400)
             
             return chart_files
             
@@ -532,122 +774,55 @@ class ReportGenerator:
             print(f"Error generating performance charts: {e}")
             return []
     
+    def render_performance_charts(self, days: int = 30) -> List[BytesIO]:
+        """Render performance charts as in-memory PNG buffers"""
+        try:
+            charts = self._build_performance_charts(days)
+            
+            if not charts:
+                return []
+            
+            buffers = [BytesIO() for _ in charts]
+            pio.write_images([fig for fig, _ in charts], buffers, format='png', width=800, height=400)
+            
+            for buffer in buffers:
+                buffer.seek(0)
+            
+            return buffers
+            
+        except Exception as e:
+            print(f"Error rendering performance charts: {e}")
+            return []
+    
     def generate_ai_learning_report(self) -> str:
         """Generate AI learning progress report"""
         try:
-            from core.journal import TradeJournal
-            from core.signals import AISignalEngine
+            signal_engine = self.signal_engine
+            generated_at = datetime.now()
             
-            journal = TradeJournal()
-            signal_engine = AISignalEngine()
-            
-            filename = f"ai_learning_report_{datetime.now().strftime('%Y%m%d')}.pdf"
+            filename = f"ai_learning_report_{generated_at.strftime('%Y%m%d')}.pdf"
             filepath = os.path.join(self.output_dir, filename)
             
             # Create PDF document
             doc = SimpleDocTemplate(filepath, pagesize=A4)
-            styles = getSampleStyleSheet()
+            styles = _STYLES
             story = []
             
             # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=30,
-                alignment=1,
-                textColor=colors.darkblue
-            )
-            
-            story.append(Paragraph("AI Learning Progress Report", title_style))
+            story.append(Paragraph("AI Learning Progress Report", _AI_REPORT_TITLE_STYLE))
             story.append(Spacer(1, 20))
             
-            # AI Performance Metrics
-            accuracy = signal_engine.get_accuracy()
-            avg_confidence = signal_engine.get_average_confidence()
-            learning_progress = signal_engine.get_learning_progress()
-            
-            ai_data = [
-                ["AI Metric", "Current Value", "Status"],
-                ["Prediction Accuracy", f"{accuracy:.1f}%", "Good" if accuracy > 70 else "Needs Improvement"],
-                ["Average Confidence", f"{avg_confidence:.1f}%", "Good" if avg_confidence > 65 else "Average"],
-                ["Learning Data Points", str(len(signal_engine.learning_data)), "Active"],
-                ["Model Status", "Trained" if signal_engine.model_trained else "Training", ""],
-                ["Learning Trend", "Improving" if len(learning_progress) > 5 and learning_progress[-1] > learning_progress[0] else "Stable", ""]
-            ]
-            
-            ai_table = Table(ai_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-            ai_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(ai_table)
-            story.append(Spacer(1, 20))
+            data = {
+                'accuracy': signal_engine.get_accuracy(),
+                'avg_confidence': signal_engine.get_average_confidence(),
+                'learning_progress': signal_engine.get_learning_progress()
+            }
             
-            # Parameter Importance
-            story.append(Paragraph("Parameter Importance in AI Decisions", styles['Heading2']))
-            
-            param_importance = [
-                ["Parameter", "Weight", "Importance"],
-                ["Delta", f"{signal_engine.parameter_weights['delta']:.2f}", "High"],
-                ["OI Change", f"{signal_engine.parameter_weights['oi_change']:.2f}", "High"],
-                ["Volume", f"{signal_engine.parameter_weights['volume']:.2f}", "Medium"],
-                ["Momentum", f"{signal_engine.parameter_weights['momentum']:.2f}", "Medium"],
-                ["Implied Volatility", f"{signal_engine.parameter_weights['iv']:.2f}", "Low"],
-                ["Spread Quality", f"{signal_engine.parameter_weights['spread']:.2f}", "Low"]
-            ]
-            
-            param_table = Table(param_importance, colWidths=[2.5*inch, 1*inch, 1.5*inch])
-            param_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.green),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(param_table)
-            story.append(Spacer(1, 20))
-            
-            # Learning Recommendations
-            story.append(Paragraph("AI Learning Recommendations", styles['Heading2']))
-            
-            recommendations = []
-            
-            if accuracy < 70:
-                recommendations.append("• Increase training data by extending paper trading period")
-                recommendations.append("• Review parameter weights for better signal accuracy")
-            
-            if avg_confidence < 65:
-                recommendations.append("• Adjust confidence threshold for more selective trading")
-                recommendations.append("• Focus on higher probability setups")
-            
-            if len(learning_progress) < 10:
-                recommendations.append("• Continue paper trading to gather more learning data")
-                recommendations.append("• Monitor AI performance over extended periods")
-            
-            if not recommendations:
-                recommendations.append("• AI performance is satisfactory")
-                recommendations.append("• Continue current learning approach")
-            
-            for rec in recommendations:
-                story.append(Paragraph(rec, styles['Normal']))
-            
-            story.append(Spacer(1, 20))
+            story.extend(self._build_sections(_AI_LEARNING_REPORT_SECTIONS, data))
             
             # Footer
             story.append(Paragraph("---", styles['Normal']))
-            story.append(Paragraph(f"Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
+            story.append(Paragraph(f"Report generated on {generated_at.strftime('%Y-%m-%d %H:%M:%S')}", 
                                  styles['Italic']))
             
             doc.build(story)
@@ -661,15 +836,14 @@ class ReportGenerator:
     def cleanup_old_reports(self, days: int = 30):
         """Clean up old report files"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            for filename in os.listdir(self.output_dir):
-                filepath = os.path.join(self.output_dir, filename)
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
-                
-                if file_mtime < cutoff_date:
-                    os.remove(filepath)
-                    print(f"Deleted old report: {filename}")
+            cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+            
+            # scandir entries carry their stat result, so no per-file path join or getmtime
+            with os.scandir(self.output_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        print(f"Deleted old report: {entry.name}")
             
         except Exception as e:
             print(f"Error cleaning up old reports: {e}")
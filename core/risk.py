@@ -1,115 +1,282 @@
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import json
+from datetime import datetime, date
+from typing import Dict, List, Optional, Set
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, fields, asdict, replace
+
+try:
+    from numba import njit  # Optional: compiles the price tick kernel
+except ImportError:
+    njit = None
+
+# Numeric position fields, kept as parallel arrays slot-aligned with the position dicts
+_POSITION_ARRAYS = ('entry_price', 'quantity', 'current_price', 'delta', 'unrealized_pnl', 'stop_loss', 'take_profit')
+_INITIAL_POSITION_CAPACITY = 64  # array slots allocated up front; doubled when full
+
+# Settings that _recompute_derived folds into cached values
+_DERIVED_INPUTS = frozenset({
+    'stop_loss_percent', 'take_profit_percent', 'max_loss_per_trade',
+    'market_open_time', 'market_close_time', 'no_trade_before', 'no_trade_after',
+    'market_holidays', 'early_close_times'
+})
+
+def _tick_kernel(idx, new_prices, entry, quantity, current, stop_loss, take_profit, unrealized):
+    """Write tick prices and P&L into the position arrays; stop-loss / take-profit masks per tick"""
+    current[idx] = new_prices
+    unrealized[idx] = (new_prices - entry[idx]) * quantity[idx]
+    # Stop loss takes precedence over take profit
+    sl_hits = new_prices <= stop_loss[idx]
+    tp_hits = ~sl_hits & (new_prices >= take_profit[idx])
+    return sl_hits, tp_hits
+
+if njit is not None:
+    _tick_kernel = njit(cache=True)(_tick_kernel)
+
+@dataclass(slots=True, frozen=True)
+class Signal:
+    """The fields of a trade signal the risk checks read"""
+    symbol: str
+    strike: Optional[float] = None
+    price: float = 0
+    quantity: int = 1
+    lot_size: int = 75
+    volume: int = 0
+    open_interest: int = 0
+    bid: float = 0
+    ask: float = 0
+    iv: float = 20
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Signal':
+        """Build a signal from its dict form, ignoring keys it does not define"""
+        return cls(**{name: data[name] for name in _SIGNAL_FIELDS if name in data})
+
+_SIGNAL_FIELDS = tuple(f.name for f in fields(Signal))
+
+def _as_signals(signals: List) -> List[Signal]:
+    """Convert a batch of signal dicts to Signal records; records pass through"""
+    return [Signal.from_dict(s) if isinstance(s, dict) else s for s in signals]
+
+def _signal_column(signals: List[Signal], name: str) -> np.ndarray:
+    """One numeric Signal field across a batch, as a float array"""
+    return np.fromiter((getattr(s, name) for s in signals), dtype=np.float64, count=len(signals))
+
+@dataclass(frozen=True, slots=True)
+class RiskSettings:
+    """Tunable risk limits, thresholds and trading hours (immutable; update_settings swaps in a new one)"""
+    # Default risk parameters
+    max_loss_per_trade: int = 5000  # ₹5000 max loss per trade
+    max_daily_loss: int = 15000     # ₹15000 max daily loss
+    max_portfolio_risk: int = 50000 # ₹50000 max portfolio risk
+    max_positions_per_symbol: int = 3
+    max_total_positions: int = 10
+    
+    # Risk thresholds
+    stop_loss_percent: float = 0.10    # 10% stop loss
+    take_profit_percent: float = 0.20  # 20% take profit
+    position_size_percent: float = 0.02 # 2% of capital per position
+    
+    # Liquidity requirements
+    min_volume: int = 1000
+    max_bid_ask_spread: float = 0.05   # 5% max spread
+    min_open_interest: int = 5000
+    
+    # Time-based restrictions
+    market_open_time: tuple = (9, 15)   # 9:15 AM
+    market_close_time: tuple = (15, 30) # 3:30 PM
+    no_trade_before: tuple = (9, 20)    # No trades before 9:20 AM
+    no_trade_after: tuple = (15, 15)    # No trades after 3:15 PM
+    market_holidays: Set[date] = field(default_factory=set)  # Exchange holidays on top of weekends
+    early_close_times: Dict[date, tuple] = field(default_factory=dict)  # date -> (hour, minute) of the last trade on shortened days
+    
+    enabled: bool = True
+
+_RISK_SETTING_FIELDS = frozenset(f.name for f in fields(RiskSettings))
 
 class RiskManager:
     def __init__(self):
-        # Default risk parameters
-        self.max_loss_per_trade = 5000  # ₹5000 max loss per trade
-        self.max_daily_loss = 15000     # ₹15000 max daily loss
-        self.max_portfolio_risk = 50000 # ₹50000 max portfolio risk
-        self.max_positions_per_symbol = 3
-        self.max_total_positions = 10
-        
-        # Risk thresholds
-        self.stop_loss_percent = 0.10    # 10% stop loss
-        self.take_profit_percent = 0.20  # 20% take profit
-        self.position_size_percent = 0.02 # 2% of capital per position
-        
-        # Liquidity requirements
-        self.min_volume = 1000
-        self.max_bid_ask_spread = 0.05   # 5% max spread
-        self.min_open_interest = 5000
-        
-        # Time-based restrictions
-        self.market_open_time = (9, 15)   # 9:15 AM
-        self.market_close_time = (15, 30) # 3:30 PM
-        self.no_trade_before = (9, 20)    # No trades before 9:20 AM
-        self.no_trade_after = (15, 15)    # No trades after 3:15 PM
-        
-        self.enabled = True
-        self.daily_pnl = 0
-        self.current_positions = []
-        
-    def validate_trade(self, signal: Dict) -> bool:
+        self.settings = RiskSettings()
+        # Realized P&L for the day; writers go through add_pnl / reset_daily_pnl
+        self._daily_pnl = 0
+        self._pnl_lock = threading.Lock()
+        
+        # Trading-hours result for the epoch minute it was computed in
+        self._tt_cache_minute = -1
+        self._tt_cache_val = False
+        self._recompute_derived()
+        
+        # Open positions: dicts for the descriptive fields plus one array per numeric field.
+        # The arrays are preallocated; only the first len(self._positions) slots are live.
+        self._positions = []
+        # "SYMBOL TYPE STRIKE" per slot, for alert messages
+        self._labels = []
+        self._capacity = _INITIAL_POSITION_CAPACITY
+        self._pos = {name: np.zeros(self._capacity, dtype=np.int64 if name == 'quantity' else np.float64)
+                     for name in _POSITION_ARRAYS}
+        # Price update key ("SYMBOL_TYPE_STRIKE") -> slots of the positions it prices
+        self._key_slots = {}
+        # Position id -> slots holding that id
+        self._id_slots = {}
+        # Open position count per symbol
+        self._positions_per_symbol = Counter()
+        
+    @property
+    def daily_pnl(self) -> float:
+        """Realized P&L for the current day"""
+        return self._daily_pnl
+    
+    def add_pnl(self, delta: float) -> float:
+        """Add realized P&L to the day's total and return the new total"""
+        with self._pnl_lock:
+            self._daily_pnl += delta
+            return self._daily_pnl
+    
+    def reset_daily_pnl(self):
+        """Start a new day's P&L from zero"""
+        with self._pnl_lock:
+            self._daily_pnl = 0
+    
+    @property
+    def current_positions(self) -> List[Dict]:
+        """Open positions being tracked"""
+        return self._positions
+    
+    def validate_trade(self, signal) -> bool:
         """
         Comprehensive trade validation
         Returns True if trade passes all risk checks
         """
-        if not self.enabled:
+        if not self.settings.enabled:
             return True  # Risk management disabled
         
-        validation_results = {
-            'time_check': self.validate_trading_time(),
-            'position_limit_check': self.validate_position_limits(signal),
-            'risk_limit_check': self.validate_risk_limits(signal),
-            'liquidity_check': self.validate_liquidity(signal),
-            'spread_check': self.validate_spread(signal),
-            'volatility_check': self.validate_volatility(signal),
-            'daily_loss_check': self.validate_daily_loss_limit()
-        }
+        if isinstance(signal, dict):
+            signal = Signal.from_dict(signal)
+        
+        # Cheapest checks first; stop at the first one that fails
+        checks = (
+            ('time_check', self.validate_trading_time),
+            ('daily_loss_check', self.validate_daily_loss_limit),
+            ('position_limit_check', lambda: self.validate_position_limits(signal)),
+            ('risk_limit_check', lambda: self.validate_risk_limits(signal)),
+            ('volatility_check', lambda: self.validate_volatility(signal)),
+            ('liquidity_check', lambda: self.validate_liquidity(signal)),
+            ('spread_check', lambda: self.validate_spread(signal))
+        )
         
-        # All checks must pass
-        all_passed = all(validation_results.values())
+        validation_results = {}
+        all_passed = True
+        for name, check in checks:
+            validation_results[name] = check()
+            if not validation_results[name]:
+                all_passed = False
+                break
         
         # Log validation results
         self.log_validation(signal, validation_results)
         
         return all_passed
     
+    def validate_trades(self, signals: List) -> np.ndarray:
+        """
+        Validate a batch of signals at once
+        Returns a boolean array, True where the signal passes all risk checks
+        """
+        n = len(signals)
+        if not self.settings.enabled:
+            return np.ones(n, dtype=bool)  # Risk management disabled
+        
+        # Checks that do not depend on the signal run once for the batch
+        if (n == 0 or not self.validate_trading_time() or not self.validate_daily_loss_limit()
+                or len(self.current_positions) >= self.settings.max_total_positions):
+            return np.zeros(n, dtype=bool)
+        
+        signals = _as_signals(signals)
+        
+        def column(name):
+            return _signal_column(signals, name)
+        
+        price = column('price')
+        bid = column('bid')
+        ask = column('ask')
+        iv = column('iv') / 100
+        symbol_positions = np.fromiter((self._positions_per_symbol.get(s.symbol, 0) for s in signals),
+                                       dtype=np.int64, count=n)
+        
+        # Position and risk limits
+        trade_value = price * column('quantity')
+        current_portfolio_value = sum(p.get('current_value', 0) for p in self.current_positions)
+        passed = symbol_positions < self.settings.max_positions_per_symbol
+        passed &= trade_value <= self.settings.max_loss_per_trade
+        passed &= (current_portfolio_value + trade_value) <= self.settings.max_portfolio_risk
+        
+        # Volatility and liquidity
+        passed &= (iv >= 0.05) & (iv <= 0.50)
+        passed &= column('volume') >= self.settings.min_volume
+        passed &= column('open_interest') >= self.settings.min_open_interest
+        
+        # Bid-ask spread
+        passed &= (price > 0) & (ask > bid) & ((ask - bid) <= self.settings.max_bid_ask_spread * price)
+        
+        return passed
+    
     def validate_trading_time(self) -> bool:
         """Check if current time is within allowed trading hours"""
+        # The answer only changes at minute boundaries
+        minute = int(time.time() // 60)
+        if minute == self._tt_cache_minute:
+            return self._tt_cache_val
+        
         now = datetime.now()
-        current_time = (now.hour, now.minute)
         
-        # Check if market is open
-        market_open = self.market_open_time
-        market_close = self.market_close_time
+        # Whether today is a trading day, and until when, only changes at midnight
+        today = now.date()
+        if today != self._trading_day[0]:
+            self._trading_day = (today, self._trading_day_end(today))
+        window_end = self._trading_day[1]
         
-        # Check if within trading hours
-        within_market_hours = (
-            (current_time >= market_open) and 
-            (current_time <= market_close)
-        )
-        
-        # Check if not in restricted time zones
-        not_in_early_restriction = current_time >= self.no_trade_before
-        not_in_late_restriction = current_time <= self.no_trade_after
+        if window_end is None:
+            result = False
+        else:
+            current_minute = now.hour * 60 + now.minute
+            result = self._trade_window_start <= current_minute <= window_end
         
+        self._tt_cache_minute = minute
+        self._tt_cache_val = result
+        return result
+    
+    def _trading_day_end(self, day: date) -> Optional[int]:
+        """Minute of day trading stops on a date, or None if the market is shut"""
         # Check if it's a weekday
-        is_weekday = now.weekday() < 5
+        if day.weekday() >= 5 or day in self.settings.market_holidays:
+            return None
         
-        return (within_market_hours and 
-                not_in_early_restriction and 
-                not_in_late_restriction and 
-                is_weekday)
+        if day in self.settings.early_close_times:
+            hour, minute = self.settings.early_close_times[day]
+            return min(self._trade_window_end, hour * 60 + minute)
+        return self._trade_window_end
     
-    def validate_position_limits(self, signal: Dict) -> bool:
+    def validate_position_limits(self, signal: Signal) -> bool:
         """Check position limit constraints"""
-        symbol = signal['symbol']
-        
-        # Count current positions for this symbol
-        symbol_positions = len([p for p in self.current_positions 
-                               if p['symbol'] == symbol])
+        symbol = signal.symbol
         
         # Check symbol-specific position limit
-        if symbol_positions >= self.max_positions_per_symbol:
+        if self._positions_per_symbol.get(symbol, 0) >= self.settings.max_positions_per_symbol:
             return False
         
         # Check total position limit
-        if len(self.current_positions) >= self.max_total_positions:
+        if len(self.current_positions) >= self.settings.max_total_positions:
             return False
         
         return True
     
-    def validate_risk_limits(self, signal: Dict) -> bool:
+    def validate_risk_limits(self, signal: Signal) -> bool:
         """Check risk limit constraints"""
-        estimated_trade_value = signal.get('price', 0) * signal.get('quantity', 1)
+        estimated_trade_value = signal.price * signal.quantity
         
         # Check per-trade risk limit
-        if estimated_trade_value > self.max_loss_per_trade:
+        if estimated_trade_value > self.settings.max_loss_per_trade:
             return False
         
         # Calculate current portfolio risk
@@ -117,48 +284,43 @@ class RiskManager:
                                     for p in self.current_positions)
         
         # Check portfolio risk limit
-        if (current_portfolio_value + estimated_trade_value) > self.max_portfolio_risk:
+        if (current_portfolio_value + estimated_trade_value) > self.settings.max_portfolio_risk:
             return False
         
         return True
     
     def validate_daily_loss_limit(self) -> bool:
         """Check if daily loss limit has been breached"""
-        return abs(self.daily_pnl) < self.max_daily_loss
+        return abs(self._daily_pnl) < self.settings.max_daily_loss
     
-    def validate_liquidity(self, signal: Dict) -> bool:
+    def validate_liquidity(self, signal: Signal) -> bool:
         """Check liquidity requirements"""
         # Get option data from signal
-        volume = signal.get('volume', 0)
-        open_interest = signal.get('open_interest', 0)
+        volume = signal.volume
+        open_interest = signal.open_interest
         
         # Check minimum volume
-        if volume < self.min_volume:
+        if volume < self.settings.min_volume:
             return False
         
         # Check minimum open interest
-        if open_interest < self.min_open_interest:
+        if open_interest < self.settings.min_open_interest:
             return False
         
         return True
     
-    def validate_spread(self, signal: Dict) -> bool:
+    def validate_spread(self, signal: Signal) -> bool:
         """Check bid-ask spread requirements"""
-        bid = signal.get('bid', 0)
-        ask = signal.get('ask', 0)
-        ltp = signal.get('price', 0)
+        bid = signal.bid
+        ask = signal.ask
+        ltp = signal.price
         
-        if ltp == 0 or ask <= bid:
-            return False
-        
-        # Calculate spread percentage
-        spread_percent = (ask - bid) / ltp
-        
-        return spread_percent <= self.max_bid_ask_spread
+        # Spread as a fraction of price, compared without dividing
+        return ltp > 0 and ask > bid and (ask - bid) <= self.settings.max_bid_ask_spread * ltp
     
-    def validate_volatility(self, signal: Dict) -> bool:
+    def validate_volatility(self, signal: Signal) -> bool:
         """Check volatility constraints"""
-        iv = signal.get('iv', 20) / 100  # Convert percentage to decimal
+        iv = signal.iv / 100  # Convert percentage to decimal
         
         # Avoid extremely high volatility (> 50%)
         if iv > 0.50:
@@ -170,40 +332,40 @@ class RiskManager:
         
         return True
     
-    def calculate_position_size(self, signal: Dict, available_capital: float) -> int:
+    def calculate_position_size(self, signal, available_capital: float) -> int:
         """Calculate appropriate position size based on risk parameters"""
+        return int(self.calculate_position_sizes([signal], available_capital)[0])
+    
+    def calculate_position_sizes(self, signals: List, available_capital: float) -> np.ndarray:
+        """Calculate position sizes (in lots) for a batch of signals"""
         if available_capital <= 0:
-            return 0
+            return np.zeros(len(signals), dtype=np.int64)
         
-        price_per_lot = signal.get('price', 0) * signal.get('lot_size', 75)
-        
-        if price_per_lot <= 0:
-            return 1
+        signals = _as_signals(signals)
+        price_per_lot = _signal_column(signals, 'price') * _signal_column(signals, 'lot_size')
         
         # Calculate based on percentage of capital
-        max_amount = available_capital * self.position_size_percent
+        max_amount = available_capital * self.settings.position_size_percent
         
         # Calculate based on risk per trade
-        risk_based_amount = min(max_amount, self.max_loss_per_trade)
+        risk_based_amount = min(max_amount, self.settings.max_loss_per_trade)
         
-        # Calculate number of lots
-        lots = int(risk_based_amount / price_per_lot)
+        # Calculate number of lots; unpriced signals get the minimum
+        valid = price_per_lot > 0
+        lots = np.trunc(risk_based_amount / np.where(valid, price_per_lot, 1.0)).astype(np.int64)
         
-        return max(1, lots)  # Minimum 1 lot
+        return np.where(valid, np.maximum(1, lots), 1)  # Minimum 1 lot
     
-    def calculate_stop_loss(self, entry_price: float, option_type: str) -> float:
-        """Calculate stop loss price"""
-        if option_type.upper() in ['CE', 'CALL']:
-            # For calls, stop loss is below entry
-            return entry_price * (1 - self.stop_loss_percent)
-        else:
-            # For puts, stop loss is below entry (puts lose value when underlying goes up)
-            return entry_price * (1 - self.stop_loss_percent)
+    def calculate_stop_loss(self, entry_price, option_type: str) -> float:
+        """Calculate stop loss price (entry_price may be a scalar or a NumPy array)"""
+        # Positions are long premium, so the stop is below entry for calls and puts alike:
+        # a bought put loses value when the underlying goes up
+        return entry_price * self._stop_loss_mul
     
-    def calculate_take_profit(self, entry_price: float, option_type: str) -> float:
-        """Calculate take profit price"""
+    def calculate_take_profit(self, entry_price, option_type: str) -> float:
+        """Calculate take profit price (entry_price may be a scalar or a NumPy array)"""
         # Take profit is always above entry for both calls and puts
-        return entry_price * (1 + self.take_profit_percent)
+        return entry_price * self._take_profit_mul
     
     def add_position(self, trade_data: Dict):
         """Add a new position to tracking"""
@@ -224,123 +386,239 @@ class RiskManager:
                 trade_data.get('type', 'CE')
             ),
             'current_price': trade_data.get('entry_price'),
+            'delta': trade_data.get('delta', 0),
             'unrealized_pnl': 0,
             'status': 'open'
         }
         
-        self.current_positions.append(position)
+        slot = len(self._positions)
+        if slot == self._capacity:
+            self._grow_position_arrays()
+        
+        self._positions.append(position)
+        self._labels.append(f"{position['symbol']} {position['type']} {position['strike']}")
+        self._key_slots.setdefault(self._position_key(position), []).append(slot)
+        self._id_slots.setdefault(position['id'], []).append(slot)
+        self._positions_per_symbol[position['symbol']] += 1
+        for name, values in self._pos.items():
+            values[slot] = position[name] or 0
+    
+    def _grow_position_arrays(self):
+        """Double the capacity of the position arrays"""
+        self._capacity *= 2
+        for name, values in self._pos.items():
+            grown = np.zeros(self._capacity, dtype=values.dtype)
+            grown[:len(values)] = values
+            self._pos[name] = grown
+    
+    def _live_arrays(self) -> Dict[str, np.ndarray]:
+        """Views of the position arrays over the live slots"""
+        n = len(self._positions)
+        return {name: values[:n] for name, values in self._pos.items()}
+    
+    @staticmethod
+    def _position_key(position: Dict) -> str:
+        """Key under which price updates for this position arrive"""
+        return f"{position['symbol']}_{position['type']}_{position['strike']}"
     
     def remove_position(self, position_id: str):
         """Remove a position from tracking"""
-        self.current_positions = [p for p in self.current_positions 
-                                 if p.get('id') != position_id]
+        slots = self._id_slots.get(position_id)
+        if not slots:
+            return
+        
+        # Highest slot first, so the last slot moved into a freed one is never itself being removed
+        for slot in sorted(slots, reverse=True):
+            self._swap_remove(slot)
+    
+    def _swap_remove(self, slot: int):
+        """Drop the position in a slot by moving the last position into it"""
+        position = self._positions[slot]
+        for index, key in ((self._key_slots, self._position_key(position)), (self._id_slots, position['id'])):
+            index[key].remove(slot)
+            if not index[key]:
+                del index[key]
+        
+        symbol = position['symbol']
+        self._positions_per_symbol[symbol] -= 1
+        if not self._positions_per_symbol[symbol]:
+            del self._positions_per_symbol[symbol]
+        
+        last = len(self._positions) - 1
+        if slot != last:
+            moved = self._positions[last]
+            self._positions[slot] = moved
+            self._labels[slot] = self._labels[last]
+            for values in self._pos.values():
+                values[slot] = values[last]
+            for key_slots in (self._key_slots[self._position_key(moved)], self._id_slots[moved['id']]):
+                key_slots[key_slots.index(last)] = slot
+        self._positions.pop()
+        self._labels.pop()
+    
+    def _resolve_price_updates(self, price_updates: Dict):
+        """Slots priced by the update keys, with the new price for each slot"""
+        # Resolve only the incoming keys, rather than scanning every position
+        slots = []
+        prices = []
+        for key, new_price in price_updates.items():
+            key_slots = self._key_slots.get(key)
+            if key_slots:
+                slots.extend(key_slots)
+                prices.extend([new_price] * len(key_slots))
+        return slots, prices
     
     def update_position_prices(self, price_updates: Dict):
         """Update current prices for all positions"""
-        for position in self.current_positions:
-            key = f"{position['symbol']}_{position['type']}_{position['strike']}"
-            if key in price_updates:
-                old_price = position['current_price']
-                new_price = price_updates[key]
-                position['current_price'] = new_price
-                
-                # Calculate unrealized P&L
-                pnl = (new_price - position['entry_price']) * position['quantity']
-                position['unrealized_pnl'] = pnl
+        slots, prices = self._resolve_price_updates(price_updates)
+        if not slots:
+            return
+        
+        pos = self._pos
+        idx = np.array(slots)
+        new_prices = np.array(prices, dtype=np.float64)
+        
+        # Calculate unrealized P&L
+        pos['current_price'][idx] = new_prices
+        pnl = (new_prices - pos['entry_price'][idx]) * pos['quantity'][idx]
+        pos['unrealized_pnl'][idx] = pnl
+        
+        for i, new_price, position_pnl in zip(slots, prices, pnl.tolist()):
+            position = self._positions[i]
+            position['current_price'] = new_price
+            position['unrealized_pnl'] = position_pnl
     
     def check_stop_loss_take_profit(self) -> List[Dict]:
         """Check if any positions hit stop loss or take profit"""
         alerts = []
         
-        for position in self.current_positions:
-            current_price = position['current_price']
-            
-            # Check stop loss
-            if current_price <= position['stop_loss']:
-                alerts.append({
-                    'type': 'stop_loss',
-                    'position': position,
-                    'message': f"Stop loss hit for {position['symbol']} {position['type']} {position['strike']}"
-                })
-            
-            # Check take profit
-            elif current_price >= position['take_profit']:
-                alerts.append({
-                    'type': 'take_profit',
-                    'position': position,
-                    'message': f"Take profit hit for {position['symbol']} {position['type']} {position['strike']}"
-                })
+        pos = self._live_arrays()
+        current_price = pos['current_price']
+        # Stop loss takes precedence when both levels are crossed
+        sl_hit = current_price <= pos['stop_loss']
+        tp_hit = ~sl_hit & (current_price >= pos['take_profit'])
+        
+        # Only the triggered positions are visited and get a message
+        for i in np.flatnonzero(sl_hit | tp_hit):
+            alerts.append(self._exit_alert('stop_loss' if sl_hit[i] else 'take_profit', i))
         
         return alerts
     
-    def get_portfolio_summary(self) -> Dict:
-        """Get current portfolio risk summary"""
-        total_positions = len(self.current_positions)
-        total_unrealized_pnl = sum(p.get('unrealized_pnl', 0) for p in self.current_positions)
-        total_investment = sum(
-            p.get('entry_price', 0) * p.get('quantity', 0) 
-            for p in self.current_positions
+    def apply_tick(self, price_updates: Dict) -> List[Dict]:
+        """
+        Update prices for the ticked positions and check them against their exits
+        Returns stop loss / take profit alerts for the positions in this tick
+        """
+        slots, prices = self._resolve_price_updates(price_updates)
+        if not slots:
+            return []
+        
+        pos = self._pos
+        idx = np.array(slots, dtype=np.int64)
+        sl_hits, tp_hits = _tick_kernel(
+            idx, np.array(prices, dtype=np.float64), pos['entry_price'], pos['quantity'],
+            pos['current_price'], pos['stop_loss'], pos['take_profit'], pos['unrealized_pnl']
         )
         
-        # Calculate risk metrics
-        portfolio_delta = sum(p.get('delta', 0) * p.get('quantity', 0) 
-                            for p in self.current_positions)
+        alerts = []
+        for i, new_price, position_pnl, sl_hit, tp_hit in zip(
+                slots, prices, pos['unrealized_pnl'][idx].tolist(), sl_hits.tolist(), tp_hits.tolist()):
+            position = self._positions[i]
+            position['current_price'] = new_price
+            position['unrealized_pnl'] = position_pnl
+            
+            if sl_hit or tp_hit:
+                alerts.append(self._exit_alert('stop_loss' if sl_hit else 'take_profit', i))
+        
+        return alerts
+    
+    def _exit_alert(self, alert_type: str, slot: int) -> Dict:
+        """Alert for the position in a slot that reached its stop loss or take profit"""
+        prefix = 'Stop loss hit for ' if alert_type == 'stop_loss' else 'Take profit hit for '
+        return {
+            'type': alert_type,
+            'position': self._positions[slot],
+            'message': prefix + self._labels[slot]
+        }
+    
+    def _compute_all_metrics(self) -> Dict:
+        """All portfolio reductions over the position arrays, computed together"""
+        pos = self._live_arrays()
+        quantity = pos['quantity']
+        unrealized = pos['unrealized_pnl']
+        total_positions = len(self._positions)
         
         return {
             'total_positions': total_positions,
+            'total_investment': float((pos['entry_price'] * quantity).sum()),
+            'unrealized_pnl': float(unrealized.sum()),
+            'portfolio_delta': float((pos['delta'] * quantity).sum()),
+            'max_drawdown': min(0, float(unrealized.min())) if total_positions else 0,
+            'winning_positions': int((unrealized > 0).sum()),
+            'positions_at_risk': int((unrealized < -self._half_max_loss).sum())
+        }
+    
+    def get_portfolio_summary(self) -> Dict:
+        """Get current portfolio risk summary"""
+        metrics = self._compute_all_metrics()
+        total_investment = metrics['total_investment']
+        
+        return {
+            'total_positions': metrics['total_positions'],
             'total_investment': total_investment,
-            'unrealized_pnl': total_unrealized_pnl,
+            'unrealized_pnl': metrics['unrealized_pnl'],
             'daily_pnl': self.daily_pnl,
-            'portfolio_delta': portfolio_delta,
-            'risk_utilization': (total_investment / self.max_portfolio_risk) * 100,
-            'daily_loss_utilization': (abs(self.daily_pnl) / self.max_daily_loss) * 100
+            'portfolio_delta': metrics['portfolio_delta'],
+            'risk_utilization': (total_investment / self.settings.max_portfolio_risk) * 100,
+            'daily_loss_utilization': (abs(self.daily_pnl) / self.settings.max_daily_loss) * 100
         }
     
     def get_risk_metrics(self) -> Dict:
         """Get detailed risk metrics"""
-        portfolio_summary = self.get_portfolio_summary()
-        
-        # Calculate additional metrics
-        max_drawdown = min(0, min(p.get('unrealized_pnl', 0) for p in self.current_positions) if self.current_positions else 0)
-        
-        winning_positions = len([p for p in self.current_positions if p.get('unrealized_pnl', 0) > 0])
-        total_positions = len(self.current_positions)
-        win_rate = (winning_positions / total_positions * 100) if total_positions > 0 else 0
+        metrics = self._compute_all_metrics()
+        total_positions = metrics['total_positions']
+        win_rate = (metrics['winning_positions'] / total_positions * 100) if total_positions > 0 else 0
         
         return {
-            'max_drawdown': max_drawdown,
+            'max_drawdown': metrics['max_drawdown'],
             'win_rate': win_rate,
-            'average_position_size': portfolio_summary['total_investment'] / max(1, total_positions),
-            'risk_reward_ratio': self.take_profit_percent / self.stop_loss_percent,
-            'positions_at_risk': len([p for p in self.current_positions 
-                                    if p.get('unrealized_pnl', 0) < -self.max_loss_per_trade * 0.5])
+            'average_position_size': metrics['total_investment'] / max(1, total_positions),
+            'risk_reward_ratio': self._rr_ratio,
+            'positions_at_risk': metrics['positions_at_risk']
         }
     
-    def log_validation(self, signal: Dict, validation_results: Dict):
+    def log_validation(self, signal: Signal, validation_results: Dict):
         """Log validation results for debugging"""
         # In production, this would log to a file or database
         failed_checks = [check for check, result in validation_results.items() if not result]
         
         if failed_checks:
-            print(f"Trade validation failed for {signal.get('symbol')} {signal.get('strike')}")
+            print(f"Trade validation failed for {signal.symbol} {signal.strike}")
             print(f"Failed checks: {failed_checks}")
     
     def update_settings(self, new_settings: Dict):
         """Update risk management settings"""
-        for key, value in new_settings.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+        changes = {key: value for key, value in new_settings.items() if key in _RISK_SETTING_FIELDS}
+        self.settings = replace(self.settings, **changes)
+        
+        if not _DERIVED_INPUTS.isdisjoint(changes):
+            self._recompute_derived()
+    
+    def _recompute_derived(self):
+        """Cache values derived from the exit, per-trade loss and trading-hours settings"""
+        self._stop_loss_mul = 1 - self.settings.stop_loss_percent
+        self._take_profit_mul = 1 + self.settings.take_profit_percent
+        self._rr_ratio = self.settings.take_profit_percent / self.settings.stop_loss_percent
+        self._half_max_loss = self.settings.max_loss_per_trade * 0.5
+        
+        # Minute-of-day trading window: market hours narrowed by the no-trade zones
+        start_hour, start_minute = max(self.settings.market_open_time, self.settings.no_trade_before)
+        end_hour, end_minute = min(self.settings.market_close_time, self.settings.no_trade_after)
+        self._trade_window_start = start_hour * 60 + start_minute
+        self._trade_window_end = end_hour * 60 + end_minute
+        self._trading_day = (None, None)
+        self._tt_cache_minute = -1
     
     def get_settings(self) -> Dict:
         """Get current risk management settings"""
-        return {
-            'max_loss_per_trade': self.max_loss_per_trade,
-            'max_daily_loss': self.max_daily_loss,
-            'max_portfolio_risk': self.max_portfolio_risk,
-            'max_positions_per_symbol': self.max_positions_per_symbol,
-            'max_total_positions': self.max_total_positions,
-            'stop_loss_percent': self.stop_loss_percent,
-            'take_profit_percent': self.take_profit_percent,
-            'position_size_percent': self.position_size_percent,
-            'enabled': self.enabled
-        }
+        return asdict(self.settings)
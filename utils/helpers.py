@@ -1,25 +1,114 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, time
+from functools import lru_cache
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, List, Optional, Union
-import re
 import json
+from bisect import bisect_right
+
+try:
+    import orjson  # Optional: faster JSON decoding in parse_json_safely
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange  # Optional: compiles the portfolio Greeks, strike analytics and payoff kernels
+except ImportError:
+    njit = None
+    prange = range
+
+_EXPIRY_CLOSE = time(15, 30)  # options expire at the 3:30 PM close
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Timestamp shared by every helper inside a frozen_now() block
+_NOW: ContextVar[Optional[datetime]] = ContextVar('_NOW', default=None)
+
+def _now() -> datetime:
+    """Current time, or the frozen timestamp inside frozen_now()"""
+    return _NOW.get() or datetime.now()
+
+@contextmanager
+def frozen_now(now: Optional[datetime] = None):
+    """
+    Evaluate time-dependent helpers against one timestamp
+    
+    Inside the block, expiry, session and market-open helpers reuse `now`
+    (default: the time of entry) instead of reading the clock per call.
+    """
+    token = _NOW.set(now or datetime.now())
+    try:
+        yield
+    finally:
+        _NOW.reset(token)
+
+# Indian number system units: ascending tier thresholds, and (divisor, suffix) per tier
+_CURRENCY_THRESHOLDS = (100000, 10000000)  # 1 lakh, 1 crore
+_CURRENCY_UNITS = ((1, ''), (100000, 'L'), (10000000, 'Cr'))
+_NUMBER_THRESHOLDS = (1000, 100000, 10000000)  # 1 thousand, 1 lakh, 1 crore
+_NUMBER_UNITS = ((1, ''), (1000, 'K'), (100000, 'L'), (10000000, 'Cr'))
+
+# Trading sessions by minute of day: 9:00, 9:15, after 15:30, after 16:00 start the next session
+_SESSION_STARTS = (9 * 60, 9 * 60 + 15, 15 * 60 + 31, 16 * 60 + 1)
+_SESSION_NAMES = ("Closed", "Pre-Market", "Regular", "After-Market", "Closed")
+_MARKET_OPEN_SECOND = 9 * 3600 + 15 * 60  # 9:15 AM
+_MARKET_CLOSE_SECOND = 15 * 3600 + 30 * 60  # 3:30 PM
+
+# Contract lot sizes; unknown symbols default to the NIFTY lot size
+_LOT_SIZES = {
+    'NIFTY': 75,
+    'BANKNIFTY': 15,
+    'FINNIFTY': 40,
+    'SENSEX': 10,
+    'RELIANCE': 250,
+    'TCS': 150,
+    'HDFCBANK': 550,
+    'INFY': 300,
+    'HINDUNILVR': 300
+}
+_DEFAULT_LOT_SIZE = 75
+
+# IV bands per symbol as (low, mid, high); these would typically come from historical data
+_VOLATILITY_RANGES = {
+    symbol: (low, (low + high) / 2, high)
+    for symbol, (low, high) in {
+        'NIFTY': (12, 25),
+        'BANKNIFTY': (15, 30),
+        'FINNIFTY': (14, 28),
+        'SENSEX': (11, 24)
+    }.items()
+}
+_DEFAULT_VOLATILITY_RANGE = _VOLATILITY_RANGES['NIFTY']
+_VOLATILITY_LABELS = np.array(["Very Low", "Low", "High", "Very High"])
+
+# format_time_until_expiry labels for the current minute; the label only changes once a minute
+_expiry_labels_minute: Optional[datetime] = None
+_expiry_labels: Dict = {}
+
+_REQUIRED_OPTION_FIELDS = frozenset(('strike', 'ltp', 'type'))
+
+# Confidence cut-offs (inclusive lower bounds) and the strength label of each band
+_SIGNAL_THRESHOLDS = np.array([55, 65, 75, 85])
+_SIGNAL_LABELS = np.array(["Very Weak", "Weak", "Moderate", "Strong", "Very Strong"])
+
+# Position Greeks summed by calculate_portfolio_greeks, in kernel column order
+_GREEK_KEYS = ('delta', 'gamma', 'theta', 'vega', 'rho')
 
 def format_currency(amount: float, symbol: str = "₹") -> str:
     """Format currency with Indian rupee symbol and proper formatting"""
-    if pd.isna(amount) or amount is None:
+    if amount is None or amount is pd.NA or amount != amount:  # x != x only for NaN/NaT
         return f"{symbol}0.00"
     
-    if abs(amount) >= 10000000:  # 1 crore
-        return f"{symbol}{amount/10000000:.2f}Cr"
-    elif abs(amount) >= 100000:  # 1 lakh
-        return f"{symbol}{amount/100000:.2f}L"
-    else:
+    divisor, suffix = _CURRENCY_UNITS[bisect_right(_CURRENCY_THRESHOLDS, abs(amount))]
+    if not suffix:
         return f"{symbol}{amount:,.2f}"
+    return f"{symbol}{amount/divisor:.2f}{suffix}"
 
 def format_percentage(value: float, decimals: int = 2) -> str:
     """Format percentage with proper sign and decimals"""
-    if pd.isna(value) or value is None:
+    if value is None or value is pd.NA or value != value:
         return "0.00%"
     
     sign = "+" if value > 0 else ""
@@ -27,35 +116,80 @@ def format_percentage(value: float, decimals: int = 2) -> str:
 
 def format_number(number: Union[int, float], decimals: int = 0) -> str:
     """Format numbers with Indian number system (lakhs, crores)"""
-    if pd.isna(number) or number is None:
+    if number is None or number is pd.NA or number != number:
         return "0"
     
-    if abs(number) >= 10000000:  # 1 crore
-        return f"{number/10000000:.1f}Cr"
-    elif abs(number) >= 100000:  # 1 lakh
-        return f"{number/100000:.1f}L"
-    elif abs(number) >= 1000:  # 1 thousand
-        return f"{number/1000:.1f}K"
-    else:
+    divisor, suffix = _NUMBER_UNITS[bisect_right(_NUMBER_THRESHOLDS, abs(number))]
+    if not suffix:
         return f"{number:.{decimals}f}"
+    return f"{number/divisor:.1f}{suffix}"
+
+def _scale_indian(values: np.ndarray, thresholds, units) -> tuple:
+    """Split values into Indian-system tiers: (scaled values, unit suffixes, mask of untiered values)"""
+    tier = np.searchsorted(thresholds, np.abs(values), side='right')
+    divisors = np.array([divisor for divisor, _ in units], dtype=np.float64)
+    suffixes = np.array([suffix for _, suffix in units])
+    return values / divisors[tier], suffixes[tier], tier == 0
+
+def format_currency_array(amounts, symbol: str = "₹") -> np.ndarray:
+    """Vectorized format_currency for a 1-D array or Series of amounts"""
+    values = np.atleast_1d(np.asarray(amounts, dtype=np.float64))
+    values = np.where(np.isnan(values), 0.0, values)
+    scaled, suffix, plain = _scale_indian(values, _CURRENCY_THRESHOLDS, _CURRENCY_UNITS)
+    
+    digits = [f"{value:,.2f}" if is_plain else f"{value:.2f}"
+              for value, is_plain in zip(scaled.tolist(), plain.tolist())]
+    return np.char.add(np.char.add(symbol, digits), suffix)
+
+def format_percentage_array(values, decimals: int = 2) -> np.ndarray:
+    """Vectorized format_percentage for a 1-D array or Series of values"""
+    values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+    missing = np.isnan(values)
+    
+    formatted = np.char.add(np.where(values > 0, '+', ''),
+                            [f"{value:.{decimals}f}%" for value in values.tolist()])
+    return np.where(missing, "0.00%", formatted)
+
+def format_number_array(numbers, decimals: int = 0) -> np.ndarray:
+    """Vectorized format_number for a 1-D array or Series of numbers"""
+    values = np.atleast_1d(np.asarray(numbers, dtype=np.float64))
+    missing = np.isnan(values)
+    scaled, suffix, plain = _scale_indian(values, _NUMBER_THRESHOLDS, _NUMBER_UNITS)
+    
+    digits = [f"{value:.{decimals}f}" if is_plain else f"{value:.1f}"
+              for value, is_plain in zip(scaled.tolist(), plain.tolist())]
+    return np.where(missing, "0", np.char.add(digits, suffix))
+
+# Display colors indexed by sign + 1: negative, zero/missing, positive
+_PNL_COLORS = ("red", "gray", "green")
+_CHANGE_COLORS = ("#FF4444", "gray", "#00C851")  # Red, gray, green
+_PNL_COLOR_TABLE = np.array(_PNL_COLORS)
+_CHANGE_COLOR_TABLE = np.array(_CHANGE_COLORS)
 
 def get_color_for_pnl(pnl: float) -> str:
     """Get color code for P&L display"""
-    if pd.isna(pnl) or pnl == 0:
-        return "gray"
-    elif pnl > 0:
-        return "green"
-    else:
-        return "red"
+    if pnl is None or pnl is pd.NA or pnl != pnl or pnl == 0:
+        return _PNL_COLORS[1]
+    return _PNL_COLORS[2] if pnl > 0 else _PNL_COLORS[0]
 
 def get_color_for_change(change: float) -> str:
     """Get color code for price change"""
-    if pd.isna(change) or change == 0:
-        return "gray"
-    elif change > 0:
-        return "#00C851"  # Green
-    else:
-        return "#FF4444"  # Red
+    if change is None or change is pd.NA or change != change or change == 0:
+        return _CHANGE_COLORS[1]
+    return _CHANGE_COLORS[2] if change > 0 else _CHANGE_COLORS[0]
+
+def _sign_index(values) -> np.ndarray:
+    """Color table index per value: 0 for negative, 1 for zero or NaN, 2 for positive"""
+    values = np.asarray(values, dtype=np.float64)
+    return (values > 0).astype(np.intp) - (values < 0) + 1
+
+def get_color_for_pnl_array(pnl) -> np.ndarray:
+    """Vectorized get_color_for_pnl, e.g. for a whole Styler column"""
+    return _PNL_COLOR_TABLE[_sign_index(pnl)]
+
+def get_color_for_change_array(change) -> np.ndarray:
+    """Vectorized get_color_for_change, e.g. for a whole Styler column"""
+    return _CHANGE_COLOR_TABLE[_sign_index(change)]
 
 def calculate_strike_distance(underlying_price: float, strike: float) -> float:
     """Calculate distance of strike from underlying price"""
@@ -80,6 +214,18 @@ def get_option_moneyness(underlying_price: float, strike: float, option_type: st
         else:
             return "OTM"
 
+def is_call_option(option_types) -> np.ndarray:
+    """Boolean call mask for an array of option type labels ('CE'/'CALL', any case)"""
+    return np.isin(np.char.upper(np.asarray(option_types, dtype=str)), ['CE', 'CALL'])
+
+def get_option_moneyness_array(underlying_price: float, strikes, is_call) -> np.ndarray:
+    """Vectorized get_option_moneyness over strike and call-mask arrays"""
+    diff = np.asarray(strikes, dtype=np.float64) - underlying_price
+    is_call = np.asarray(is_call, dtype=bool)
+    itm = np.where(is_call, diff < 0, diff > 0)
+    atm = np.abs(diff) < 50  # Within 50 points
+    return np.select([itm, atm], ['ITM', 'ATM'], 'OTM')
+
 def calculate_breakeven(strike: float, premium: float, option_type: str) -> float:
     """Calculate breakeven point for option"""
     if option_type.upper() in ['CE', 'CALL']:
@@ -87,18 +233,29 @@ def calculate_breakeven(strike: float, premium: float, option_type: str) -> floa
     else:  # PUT
         return strike - premium
 
+def calculate_breakeven_array(strikes, premiums, is_call) -> np.ndarray:
+    """Vectorized calculate_breakeven over strike, premium and call-mask arrays"""
+    strikes = np.asarray(strikes, dtype=np.float64)
+    premiums = np.asarray(premiums, dtype=np.float64)
+    return np.where(is_call, strikes + premiums, strikes - premiums)
+
+def _parse_expiry(expiry_date) -> datetime:
+    """Expiry at the 3:30 PM close, from a YYYY-MM-DD string or a datetime"""
+    if isinstance(expiry_date, str):
+        # Fixed-width ISO dates take the C fromisoformat parser; anything else goes through strptime
+        if len(expiry_date) == 10 and expiry_date[4] == '-' and expiry_date[7] == '-':
+            return datetime.combine(date.fromisoformat(expiry_date), _EXPIRY_CLOSE)
+        expiry_date = datetime.strptime(expiry_date, "%Y-%m-%d")
+    
+    # Set expiry time to 3:30 PM
+    return expiry_date.replace(hour=15, minute=30, second=0, microsecond=0)
+
 def time_until_expiry(expiry_date: str) -> Dict[str, int]:
     """Calculate time until expiry in days, hours, minutes"""
     try:
-        if isinstance(expiry_date, str):
-            expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
-        else:
-            expiry = expiry_date
-        
-        # Set expiry time to 3:30 PM
-        expiry = expiry.replace(hour=15, minute=30, second=0, microsecond=0)
+        expiry = _parse_expiry(expiry_date)
         
-        now = datetime.now()
+        now = _now()
         time_diff = expiry - now
         
         if time_diff.total_seconds() <= 0:
@@ -114,7 +271,22 @@ def time_until_expiry(expiry_date: str) -> Dict[str, int]:
         return {"days": 0, "hours": 0, "minutes": 0, "expired": True}
 
 def format_time_until_expiry(expiry_date: str) -> str:
-    """Format time until expiry as human readable string"""
+    """Format time until expiry as human readable string (memoized per wall-clock minute)"""
+    minute = _now().replace(second=0, microsecond=0)
+    global _expiry_labels_minute, _expiry_labels
+    if minute != _expiry_labels_minute:
+        _expiry_labels_minute, _expiry_labels = minute, {}
+    
+    try:
+        return _expiry_labels[expiry_date]
+    except KeyError:
+        label = _expiry_labels[expiry_date] = _format_time_until_expiry(expiry_date)
+        return label
+    except TypeError:  # unhashable input
+        return _format_time_until_expiry(expiry_date)
+
+def _format_time_until_expiry(expiry_date: str) -> str:
+    """Uncached format_time_until_expiry"""
     time_info = time_until_expiry(expiry_date)
     
     if time_info["expired"]:
@@ -143,64 +315,186 @@ def calculate_option_value_at_expiry(underlying_price: float, strike: float, opt
     else:  # PUT
         return max(0, strike - underlying_price)
 
+def calculate_option_value_at_expiry_array(underlying_price, strikes, is_call) -> np.ndarray:
+    """Vectorized calculate_option_value_at_expiry over strike and call-mask arrays"""
+    diff = np.asarray(underlying_price, dtype=np.float64) - np.asarray(strikes, dtype=np.float64)
+    return np.fmax(0, np.where(is_call, diff, -diff))
+
+def _strike_analytics_kernel(underlying_price: float, strikes: np.ndarray, premiums: np.ndarray,
+                             is_call: np.ndarray):
+    """Distance %, breakeven, intrinsic value and validity per strike, in one fused loop"""
+    n = strikes.shape[0]
+    distance = np.zeros(n)
+    breakeven = np.empty(n)
+    intrinsic = np.empty(n)
+    valid = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        diff = strikes[i] - underlying_price
+        if underlying_price != 0:
+            distance[i] = diff / underlying_price * 100
+        if is_call[i]:
+            breakeven[i] = strikes[i] + premiums[i]
+            intrinsic[i] = max(0.0, -diff)
+        else:
+            breakeven[i] = strikes[i] - premiums[i]
+            intrinsic[i] = max(0.0, diff)
+        if strikes[i] > 0 and underlying_price > 0:
+            ratio = strikes[i] / underlying_price
+            valid[i] = 0.5 <= ratio <= 1.5
+    return distance, breakeven, intrinsic, valid
+
+if njit is not None:
+    _strike_analytics_kernel = njit(cache=True)(_strike_analytics_kernel)
+else:
+    def _strike_analytics_kernel(underlying_price: float, strikes: np.ndarray, premiums: np.ndarray,
+                                 is_call: np.ndarray):
+        """Distance %, breakeven, intrinsic value and validity per strike"""
+        diff = strikes - underlying_price
+        if underlying_price != 0:
+            distance = diff / underlying_price * 100
+        else:
+            distance = np.zeros(len(strikes))
+        breakeven = np.where(is_call, strikes + premiums, strikes - premiums)
+        intrinsic = np.fmax(0.0, np.where(is_call, -diff, diff))
+        if underlying_price > 0:
+            ratio = strikes / underlying_price
+            valid = (strikes > 0) & (ratio >= 0.5) & (ratio <= 1.5)
+        else:
+            valid = np.zeros(len(strikes), dtype=bool)
+        return distance, breakeven, intrinsic, valid
+
+def calculate_strike_analytics(underlying_price: float, strikes, premiums, is_call) -> Dict[str, np.ndarray]:
+    """
+    Strike distance, breakeven, intrinsic value at expiry and strike validity for a whole chain
+    
+    Array equivalent of calling calculate_strike_distance, calculate_breakeven,
+    calculate_option_value_at_expiry and validate_strike_price per option.
+    """
+    distance, breakeven, intrinsic, valid = _strike_analytics_kernel(
+        float(underlying_price),
+        np.ascontiguousarray(strikes, dtype=np.float64),
+        np.ascontiguousarray(premiums, dtype=np.float64),
+        np.ascontiguousarray(is_call, dtype=bool)
+    )
+    return {'distance': distance, 'breakeven': breakeven, 'intrinsic_value': intrinsic, 'valid': valid}
+
+@lru_cache(maxsize=32)
+def _next_thursday_from(ordinal: int) -> str:
+    """Next Thursday strictly after the given proleptic Gregorian ordinal, as YYYY-MM-DD"""
+    weekday = (ordinal - 1) % 7  # ordinal 1 (0001-01-01) is a Monday
+    days_ahead = (3 - weekday) % 7 or 7  # Thursday is 3; today being Thursday means next week
+    return date.fromordinal(ordinal + days_ahead).isoformat()
+
+def _payoff_grid_kernel(underlying: np.ndarray, strikes: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """Intrinsic value at expiry for every (scenario, option) cell of an n_scenarios x n_options grid"""
+    n_scenarios, n_options = underlying.shape
+    payoff = np.empty((n_scenarios, n_options))
+    for p in prange(n_scenarios):
+        for j in range(n_options):
+            diff = underlying[p, j] - strikes[j] if is_call[j] else strikes[j] - underlying[p, j]
+            payoff[p, j] = diff if diff > 0 else 0.0
+    return payoff
+
+if njit is not None:
+    _payoff_grid_kernel = njit(parallel=True, cache=True)(_payoff_grid_kernel)
+else:
+    def _payoff_grid_kernel(underlying: np.ndarray, strikes: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+        """Intrinsic value at expiry for every (scenario, option) cell of an n_scenarios x n_options grid"""
+        diff = underlying - strikes
+        return np.fmax(0.0, np.where(is_call, diff, -diff))
+
+def calculate_payoff_grid(underlying_prices, strikes, is_call) -> np.ndarray:
+    """
+    calculate_option_value_at_expiry over a scenario grid
+    
+    underlying_prices: one level per scenario (1-D), or one per scenario and option
+    (n_scenarios x n_options). Returns the n_scenarios x n_options intrinsic value matrix.
+    """
+    strikes = np.ascontiguousarray(strikes, dtype=np.float64)
+    underlying = np.asarray(underlying_prices, dtype=np.float64)
+    if underlying.ndim == 1:
+        underlying = underlying[:, None]
+    underlying = np.broadcast_to(underlying, (underlying.shape[0], len(strikes)))
+    
+    return _payoff_grid_kernel(underlying, strikes, np.ascontiguousarray(is_call, dtype=bool))
+
 def get_next_expiry_date(current_date: datetime = None) -> str:
     """Get next Thursday (weekly expiry) date"""
     if current_date is None:
-        current_date = datetime.now()
+        current_date = _now()
+    if isinstance(current_date, datetime):
+        current_date = current_date.date()
     
-    # Find next Thursday
-    days_ahead = 3 - current_date.weekday()  # Thursday is 3
-    if days_ahead <= 0:  # Today is Thursday or later in week
-        days_ahead += 7
-    
-    next_thursday = current_date + timedelta(days=days_ahead)
-    return next_thursday.strftime("%Y-%m-%d")
+    return _next_thursday_from(current_date.toordinal())
 
+@lru_cache(maxsize=32)
 def get_monthly_expiry_date(year: int, month: int) -> str:
     """Get last Thursday of the month (monthly expiry)"""
     # Last day of the month
     if month == 12:
-        last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
+        last_day = date(year + 1, 1, 1).toordinal() - 1
     else:
-        last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-    
-    # Find last Thursday
-    while last_day.weekday() != 3:  # Thursday is 3
-        last_day -= timedelta(days=1)
+        last_day = date(year, month + 1, 1).toordinal() - 1
     
-    return last_day.strftime("%Y-%m-%d")
+    # Step back to the last Thursday (Thursday is 3)
+    last_day -= ((last_day - 1) % 7 - 3) % 7
+    return date.fromordinal(last_day).isoformat()
+
+def _portfolio_greeks_kernel(greeks: np.ndarray, total_quantity: np.ndarray) -> np.ndarray:
+    """Sum per-position Greeks (n x 5, _GREEK_KEYS order) weighted by quantity * lot size, in one pass"""
+    totals = np.zeros(greeks.shape[1])
+    for i in range(greeks.shape[0]):
+        for j in range(greeks.shape[1]):
+            totals[j] += greeks[i, j] * total_quantity[i]
+    return totals
+
+if njit is not None:
+    _portfolio_greeks_kernel = njit(cache=True)(_portfolio_greeks_kernel)
+else:
+    def _portfolio_greeks_kernel(greeks: np.ndarray, total_quantity: np.ndarray) -> np.ndarray:
+        """Sum per-position Greeks (n x 5, _GREEK_KEYS order) weighted by quantity * lot size"""
+        return total_quantity @ greeks
+
+def _portfolio_greeks(greeks: np.ndarray, quantity: np.ndarray, lot_size: np.ndarray) -> Dict[str, float]:
+    """Portfolio Greeks dict from per-position Greek, quantity and lot size arrays"""
+    totals = _portfolio_greeks_kernel(np.ascontiguousarray(greeks, dtype=np.float64),
+                                      np.ascontiguousarray(quantity * lot_size, dtype=np.float64))
+    return dict(zip(_GREEK_KEYS, totals.tolist()))
 
 def calculate_portfolio_greeks(positions: List[Dict]) -> Dict[str, float]:
     """Calculate portfolio-level Greeks from individual positions"""
-    portfolio_greeks = {
-        'delta': 0,
-        'gamma': 0,
-        'theta': 0,
-        'vega': 0,
-        'rho': 0
-    }
-    
-    for position in positions:
-        quantity = position.get('quantity', 0)
-        lot_size = position.get('lot_size', 75)
-        total_quantity = quantity * lot_size
-        
-        # Multiply Greeks by position size
-        portfolio_greeks['delta'] += position.get('delta', 0) * total_quantity
-        portfolio_greeks['gamma'] += position.get('gamma', 0) * total_quantity
-        portfolio_greeks['theta'] += position.get('theta', 0) * total_quantity
-        portfolio_greeks['vega'] += position.get('vega', 0) * total_quantity
-        portfolio_greeks['rho'] += position.get('rho', 0) * total_quantity
+    if not positions:
+        return dict.fromkeys(_GREEK_KEYS, 0)
+    
+    n = len(positions)
+    quantity = np.fromiter((position.get('quantity', 0) for position in positions), dtype=np.float64, count=n)
+    lot_size = np.fromiter((position.get('lot_size', 75) for position in positions), dtype=np.float64, count=n)
+    greeks = np.array([[position.get(key, 0) for key in _GREEK_KEYS] for position in positions],
+                      dtype=np.float64)
     
-    return portfolio_greeks
+    # Multiply Greeks by position size
+    return _portfolio_greeks(greeks, quantity, lot_size)
+
+def calculate_portfolio_greeks_df(positions: pd.DataFrame) -> Dict[str, float]:
+    """calculate_portfolio_greeks for positions held as a DataFrame (missing columns count as 0 / lot 75)"""
+    if positions.empty:
+        return dict.fromkeys(_GREEK_KEYS, 0)
+    
+    def column(name, default):
+        if name in positions:
+            return positions[name].to_numpy(dtype=np.float64)
+        return np.full(len(positions), default, dtype=np.float64)
+    
+    greeks = np.column_stack([column(key, 0) for key in _GREEK_KEYS])
+    return _portfolio_greeks(greeks, column('quantity', 0), column('lot_size', 75))
 
 def clean_text(text: str, max_length: int = 100) -> str:
     """Clean and truncate text for display"""
     if not text:
         return ""
     
-    # Remove extra whitespace
-    cleaned = re.sub(r'\s+', ' ', text.strip())
+    # Collapse whitespace runs; str.split() splits on exactly the characters regex \s matches
+    cleaned = ' '.join(text.split())
     
     # Truncate if too long
     if len(cleaned) > max_length:
@@ -223,57 +517,36 @@ def parse_json_safely(json_string: str, default: Dict = None) -> Dict:
         default = {}
     
     try:
-        if not json_string or json_string == "{}":
+        if not json_string or json_string in ("{}", "null"):
             return default
-        return json.loads(json_string)
+        return _json_loads(json_string)
     except (json.JSONDecodeError, TypeError):
         return default
 
-def get_trading_session() -> str:
-    """Get current trading session"""
-    now = datetime.now()
-    hour = now.hour
-    minute = now.minute
-    current_time = hour * 100 + minute
-    
-    # Pre-market: 9:00 - 9:15
-    if 900 <= current_time < 915:
-        return "Pre-Market"
-    # Regular session: 9:15 - 15:30
-    elif 915 <= current_time <= 1530:
-        return "Regular"
-    # After market: 15:30 - 16:00
-    elif 1530 < current_time <= 1600:
-        return "After-Market"
-    else:
-        return "Closed"
-
-def is_market_open() -> bool:
-    """Check if market is currently open"""
-    now = datetime.now()
+def get_trading_session(now: Optional[datetime] = None) -> str:
+    """Get current trading session (now defaults to the current time)"""
+    if now is None:
+        now = _now()
     
-    # Check if it's a weekday (Monday=0 to Friday=4)
-    if now.weekday() >= 5:  # Weekend
-        return False
-    
-    # Check time (9:15 AM to 3:30 PM)
-    market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
-    market_close = now.replace(hour=15, minute=30, second=0, microsecond=0)
+    # Pre-market 9:00 - 9:15, regular 9:15 - 15:30, after market 15:30 - 16:00
+    return _SESSION_NAMES[bisect_right(_SESSION_STARTS, now.hour * 60 + now.minute)]
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """Check if market is currently open (now defaults to the current time)"""
+    if now is None:
+        now = _now()
     
-    return market_open <= now <= market_close
+    # Weekday (Monday=0 to Friday=4), 9:15 AM to 3:30 PM inclusive
+    second = now.hour * 3600 + now.minute * 60 + now.second
+    return (now.weekday() < 5 and _MARKET_OPEN_SECOND <= second <= _MARKET_CLOSE_SECOND
+            and (second < _MARKET_CLOSE_SECOND or now.microsecond == 0))
 
 def calculate_days_to_expiry(expiry_date: str) -> float:
     """Calculate days to expiry as decimal for option pricing"""
     try:
-        if isinstance(expiry_date, str):
-            expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
-        else:
-            expiry = expiry_date
+        expiry = _parse_expiry(expiry_date)
         
-        # Set expiry time to 3:30 PM
-        expiry = expiry.replace(hour=15, minute=30, second=0, microsecond=0)
-        
-        now = datetime.now()
+        now = _now()
         time_diff = expiry - now
         
         # Return days as decimal (including fractional day)
@@ -282,22 +555,32 @@ def calculate_days_to_expiry(expiry_date: str) -> float:
     except Exception:
         return 0
 
+def calculate_days_to_expiry_batch(expiries, now: Optional[datetime] = None) -> np.ndarray:
+    """
+    calculate_days_to_expiry over an array or Series of expiries
+    
+    Each distinct expiry is parsed once and the result gathered back to every row;
+    unparseable or missing expiries give 0, as in the scalar version.
+    """
+    if now is None:
+        now = _now()
+    
+    codes, uniques = pd.factorize(np.asarray(expiries, dtype=object))
+    seconds = np.empty(len(uniques) + 1)
+    seconds[-1] = 0.0  # code -1 (missing) gathers this slot
+    for i, expiry_date in enumerate(uniques):
+        try:
+            seconds[i] = (_parse_expiry(expiry_date) - now).total_seconds()
+        except Exception:
+            seconds[i] = 0.0
+    
+    return np.maximum(0, seconds[codes] / (24 * 3600))
+
 def get_lot_size(symbol: str) -> int:
     """Get lot size for different symbols"""
-    lot_sizes = {
-        'NIFTY': 75,
-        'BANKNIFTY': 15,
-        'FINNIFTY': 40,
-        'SENSEX': 10,
-        'RELIANCE': 250,
-        'TCS': 150,
-        'HDFCBANK': 550,
-        'INFY': 300,
-        'HINDUNILVR': 300
-    }
-    
-    return lot_sizes.get(symbol.upper(), 75)  # Default to NIFTY lot size
+    return _LOT_SIZES.get(symbol.upper(), _DEFAULT_LOT_SIZE)
 
+@lru_cache(maxsize=2048)
 def format_strike_price(strike: float) -> str:
     """Format strike price for display"""
     if strike >= 10000:
@@ -315,38 +598,35 @@ def calculate_premium_decay(days_to_expiry: float, theta: float) -> float:
 
 def get_volatility_percentile(current_iv: float, symbol: str) -> str:
     """Get volatility percentile description"""
-    # These would typically come from historical data
-    volatility_ranges = {
-        'NIFTY': {'low': 12, 'high': 25},
-        'BANKNIFTY': {'low': 15, 'high': 30},
-        'FINNIFTY': {'low': 14, 'high': 28},
-        'SENSEX': {'low': 11, 'high': 24}
-    }
+    low, mid, high = _VOLATILITY_RANGES.get(symbol, _DEFAULT_VOLATILITY_RANGE)
     
-    ranges = volatility_ranges.get(symbol, {'low': 12, 'high': 25})
-    
-    if current_iv < ranges['low']:
+    if current_iv < low:
         return "Very Low"
-    elif current_iv < (ranges['low'] + ranges['high']) / 2:
+    elif current_iv < mid:
         return "Low"
-    elif current_iv < ranges['high']:
+    elif current_iv < high:
         return "High"
     else:
         return "Very High"
 
+def get_volatility_percentile_array(current_iv, symbol: str) -> np.ndarray:
+    """Vectorized get_volatility_percentile for an array of IVs of one symbol"""
+    band = np.searchsorted(_VOLATILITY_RANGES.get(symbol, _DEFAULT_VOLATILITY_RANGE),
+                           np.asarray(current_iv, dtype=np.float64), side='right')
+    return _VOLATILITY_LABELS[band]  # NaN sorts past every bound: "Very High", as in the scalar version
+
 def validate_option_data(option_data: Dict) -> bool:
     """Validate option data completeness"""
-    required_fields = ['strike', 'ltp', 'type']
-    
-    for field in required_fields:
-        if field not in option_data or option_data[field] is None:
-            return False
+    if not option_data.keys() >= _REQUIRED_OPTION_FIELDS:
+        return False
     
-    # Check if values are reasonable
-    if option_data['ltp'] < 0 or option_data['strike'] <= 0:
+    ltp = option_data['ltp']
+    strike = option_data['strike']
+    if ltp is None or strike is None or option_data['type'] is None:
         return False
     
-    return True
+    # Check if values are reasonable
+    return not (ltp < 0 or strike <= 0)
 
 def get_signal_strength(confidence: float) -> str:
     """Convert confidence score to signal strength description"""
@@ -361,6 +641,12 @@ def get_signal_strength(confidence: float) -> str:
     else:
         return "Very Weak"
 
+def get_signal_strength_array(confidence) -> np.ndarray:
+    """Vectorized get_signal_strength for an array of confidence scores"""
+    confidence = np.asarray(confidence, dtype=np.float64)
+    band = np.searchsorted(_SIGNAL_THRESHOLDS, confidence, side='right')
+    return _SIGNAL_LABELS[np.where(np.isnan(confidence), 0, band)]
+
 def calculate_risk_reward_ratio(entry_price: float, stop_loss: float, target_price: float) -> float:
     """Calculate risk-reward ratio"""
     if entry_price == 0 or stop_loss == entry_price: